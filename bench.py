@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+try:
+    import resource   # มีเฉพาะ Unix ใช้อ่าน peak RSS ของทั้ง process
+except ImportError:
+    resource = None
+
+import game_logic
+from game_logic import DIFFICULTY_SETTINGS, TICK, BotTypist, GameState
+from frame_profiler import FrameProfiler
+
+# ==========================================
+# Benchmark (วัดประสิทธิภาพแบบทำซ้ำได้)
+# ==========================================
+# ให้บอทพิมพ์เล่นแต่ละ scenario ตามจำนวนเฟรมที่กำหนด (1 เฟรม = 1 tick ไม่จำกัด FPS)
+# ใช้ seed คงที่ทุกครั้ง ผลลัพธ์ของเกม (score, ticks) จึงเหมือนเดิมทุก commit ต่างกันแค่เวลา
+# วาดด้วยโค้ดเดียวกับในเกม (main.draw_playfield) บนจอ dummy ของ SDL
+#
+#   python bench.py --out bench.json
+#   python bench.py --compare bench.json     (เทียบกับผลของ commit ก่อน)
+
+# scenario ที่ขยายจำนวนศัตรู: เกิดทุก tick และตกช้าจนสะสมเต็มจอ
+SCALED = {"min_speed": 5, "max_speed": 15, "start_delay": TICK, "min_delay": TICK, "time_limit": 600}
+
+# wave ที่มีทั้ง burst, หยุดพัก และเร่งความเร็ว วนซ้ำทุก 10 วินาที
+WAVES = [wave for start in range(0, 600, 10) for wave in (
+    {"at": start + 2, "burst": 20, "gap": 0.05},
+    {"at": start + 5, "pause": 2, "speed": 1.5},
+    {"at": start + 8, "speed": 1.0, "delay": 0.3},
+)]
+
+SCENARIOS = {
+    "easy": DIFFICULTY_SETTINGS["EASY"],
+    "normal": DIFFICULTY_SETTINGS["NORMAL"],
+    "hard": DIFFICULTY_SETTINGS["HARD"],
+    "swarm_100": dict(DIFFICULTY_SETTINGS["HARD"], max_enemies=100, **SCALED),
+    "swarm_1000": dict(DIFFICULTY_SETTINGS["HARD"], max_enemies=1000, **SCALED),
+    "waves": dict(DIFFICULTY_SETTINGS["HARD"], max_enemies=100, time_limit=600, waves=WAVES),
+}
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak   # macOS รายงานเป็น byte
+
+def run_scenario(main, name, frames, seed, bot_options, trace_memory=False):
+    settings = SCENARIOS[name]
+    profiler = FrameProfiler(capacity=frames, enabled=True)
+    dirty = main.DirtyRectTracker()
+    bot = BotTypist(seed=seed, **bot_options)
+    game = GameState(settings, main.WORD_LIST, seed, enemy_class=main.Enemy)
+    restarts = peak_enemies = score = 0
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(frames):
+        profiler.begin_frame()
+        chars = bot(game)
+        for char_pressed in chars:
+            game.type_char(char_pressed)   # ทางเดียวกับ KEYDOWN ในเกม
+        profiler.mark(0)
+        game.step(TICK)
+        if game.game_over:
+            # จำนวนเฟรมต้องเท่ากันทุกครั้ง ถ้าแพ้ก่อนก็เริ่มรอบใหม่ต่อ
+            score += game.score
+            restarts += 1
+            game = GameState(settings, main.WORD_LIST, seed + restarts, enemy_class=main.Enemy)
+        peak_enemies = max(peak_enemies, len(game.enemies))
+        profiler.mark(1)
+        main.screen.fill(main.BLACK)
+        main.draw_playfield(main.screen, game, 0.0, dirty)
+        profiler.mark(2)
+        dirty.present()
+        profiler.mark(3)
+        profiler.end_frame(len(game.enemies))
+    elapsed = time.perf_counter() - start
+    python_peak = None
+    if trace_memory:
+        python_peak = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "frames": frames,
+        "fps": frames / elapsed,
+        "frame_ms": {f"p{p}": ms for p, ms in profiler.percentiles((50, 95, 99, 100)).items()},
+        "phase_means_ms": profiler.phase_means(),
+        "peak_enemies": peak_enemies,
+        "score": score + game.score,
+        "restarts": restarts,
+        "python_peak_kb": python_peak,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+def compare(old, new, max_regression):
+    """พิมพ์ผลเทียบกับไฟล์เก่า คืน True ถ้าไม่มี scenario ไหน FPS ตกเกิน max_regression (%)"""
+    old_results = {result["scenario"]: result for result in old["scenarios"]}
+    ok = True
+    for result in new["scenarios"]:
+        before = old_results.get(result["scenario"])
+        if before is None:
+            continue
+        change = (result["fps"] / before["fps"] - 1) * 100
+        p99_change = result["frame_ms"]["p99"] - before["frame_ms"]["p99"]
+        flag = ""
+        if change < -max_regression:
+            flag = "  <-- ช้าลง"
+            ok = False
+        if result["score"] != before["score"]:
+            flag += "  (score ไม่ตรง: ตรรกะเกมเปลี่ยน เทียบกันตรงๆ ไม่ได้)"
+        print(f"[Bench] {result['scenario']:<11} fps {before['fps']:8.1f} -> {result['fps']:8.1f} ({change:+.1f}%)"
+              f"  p99 {p99_change:+.2f} ms{flag}", file=sys.stderr)
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="วัด FPS / frame time / หน่วยความจำ ด้วยบอทพิมพ์อัตโนมัติ")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS), help=f"เลือก scenario ({', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=1800, help="จำนวนเฟรมต่อ scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--wpm", type=float, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--strategy", choices=game_logic.BOT_STRATEGIES, default="lowest")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="วัด peak หน่วยความจำของ Python ด้วย tracemalloc (ทำให้ FPS ต่ำลง)")
+    parser.add_argument("--window", action="store_true", help="แสดงหน้าต่างจริงแทนจอ dummy")
+    parser.add_argument("--out", metavar="FILE", help="บันทึกผลเป็น JSON (ไม่ใส่ = พิมพ์ออก stdout)")
+    parser.add_argument("--compare", metavar="FILE", help="เทียบกับผล JSON ของ commit ก่อน")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="FPS ตกเกินกี่ %% ถึงนับว่าช้าลง (exit code 1)")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"ไม่รู้จัก scenario {name!r}")
+
+    if not args.window:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import main
+    main.init_display()
+    main.load_fonts()
+    main.load_monster_images()
+    words = main.load_words('words.txt')
+    if words:
+        main.WORD_LIST = words
+
+    bot_options = {"wpm": args.wpm, "error_rate": args.error_rate, "strategy": args.strategy}
+    results = []
+    for name in args.scenarios:
+        result = run_scenario(main, name, args.frames, args.seed, bot_options, args.trace_memory)
+        print(f"[Bench] {name:<11} {result['fps']:8.1f} fps  p50 {result['frame_ms']['p50']:.2f} ms"
+              f"  p99 {result['frame_ms']['p99']:.2f} ms  enemies {result['peak_enemies']}", file=sys.stderr)
+        results.append(result)
+
+    report = {
+        "python": platform.python_version(),
+        "pygame": main.pygame.version.ver,
+        "numpy": game_logic.np is not None,
+        "platform": platform.platform(),
+        "bot": bot_options,
+        "seed": args.seed,
+        "scenarios": results,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=1)
+        print(f"[Bench] บันทึกผลไว้ที่ {args.out}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    ok = True
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            ok = compare(json.load(file), report, args.max_regression)
+    main.pygame.quit()
+    sys.exit(0 if ok else 1)
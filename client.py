@@ -0,0 +1,227 @@
+import sys
+import json
+import time
+import queue
+import socket
+import asyncio
+import argparse
+import threading
+
+import protocol
+import word_index
+from game_logic import TICK, DIFFICULTY_SETTINGS, BotTypist
+from server import DEFAULT_PORT
+
+# ==========================================
+# Client ของ server.py
+# ==========================================
+# เล่นผ่าน server: ส่งตัวอักษรที่กด รับ DIFF มาอัปเดต RemoteState แล้ววาดด้วย draw_playfield ชุดเดียวกับเกม
+# --bots N: เปิดบอท N session พร้อมกัน (ไม่มีหน้าจอ) เพื่อทดสอบโหลดและวัด latency
+
+def connect(host, port, unix_path=None):
+    if unix_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(unix_path)
+    else:
+        sock = socket.create_connection((host, port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)   # ส่งตัวอักษรทันที ไม่รอรวม packet
+    return sock
+
+class Connection:
+    """socket ธรรมดา + thread อ่าน frame ใส่ queue ให้ loop ของ pygame ดึงไปใช้ทีละเฟรม"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.file = sock.makefile('rb')
+        self.inbox = queue.SimpleQueue()
+        self.seq = 0
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        while True:
+            try:
+                frame = protocol.read_frame_blocking(self.file)
+            except (OSError, ValueError):
+                frame = None
+            self.inbox.put(frame)   # None = หลุดการเชื่อมต่อ
+            if frame is None:
+                return
+
+    def send(self, data):
+        try:
+            self.sock.sendall(data)
+        except OSError:
+            pass
+
+    def send_keys(self, chars):
+        self.seq += 1
+        self.send(protocol.pack_keys(self.seq, chars))
+
+    def frames(self):
+        while True:
+            try:
+                yield self.inbox.get_nowait()
+            except queue.Empty:
+                return
+
+    def close(self):
+        self.send(protocol.pack(protocol.BYE))
+        self.sock.close()
+
+# ==========================================
+# 1. เล่นผ่าน server (มีหน้าจอ)
+# ==========================================
+def play(host, port, unix_path, mode, fps_limit=60):
+    import main   # ใช้ฟอนต์ รูป และโค้ดวาดชุดเดียวกับเกม
+    pygame = main.pygame
+    main.init_display()
+    main.load_fonts()
+
+    connection = Connection(connect(host, port, unix_path))
+    connection.send(protocol.pack_json(protocol.HELLO, {"mode": mode}))
+    remote = protocol.RemoteState(enemy_class=main.Enemy)
+    dirty = main.DirtyRectTracker()
+    layers = main.LayerCache()
+    playing = True
+    running = True
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                char_pressed = event.unicode.lower()
+                if event.key == pygame.K_ESCAPE or (not playing and char_pressed == 'r'):
+                    running = False   # เวลาในเกมเดินที่ server จึงไม่มี Pause
+                elif playing and word_index.is_typeable(char_pressed):
+                    connection.send_keys(char_pressed)
+
+        remote.advance(main.clock.get_time() / 1000)
+        for frame in connection.frames():
+            if frame is None:
+                print("[Warning] หลุดการเชื่อมต่อกับ server")
+                playing = running = False
+                break
+            kind, payload = frame
+            if kind == protocol.DIFF:
+                remote.apply(payload)
+            elif kind == protocol.WELCOME:
+                welcome = json.loads(payload)
+                print(f"[System] เข้าเล่น session {welcome['session']} โหมด {welcome['mode']} (seed {welcome['seed']})")
+            elif kind == protocol.END:
+                remote.finish(json.loads(payload))
+                playing = False
+                dirty.invalidate()
+            elif kind == protocol.ERROR:
+                print(f"[Warning] server: {payload.decode('utf-8')}")
+                running = False
+
+        if playing:
+            main.screen.fill(main.BLACK)
+            main.draw_playfield(main.screen, remote, 1.0, dirty)
+        else:
+            main.screen.blit(layers.get("game_over", remote, lambda: main.build_game_over_layer(remote)), (0, 0))
+        dirty.present()
+        main.clock.tick(fps_limit)
+
+    connection.close()
+    pygame.quit()
+
+# ==========================================
+# 2. ทดสอบโหลดด้วยบอท (ไม่มีหน้าจอ)
+# ==========================================
+class LoadStats:
+    def __init__(self):
+        self.key_latency = protocol.LatencyStats()   # ส่งตัวอักษร -> ได้ DIFF ที่ประมวลผลตัวนั้นแล้ว
+        self.diffs = 0
+        self.bytes = 0
+        self.connected = 0
+        self.finished = 0
+        self.errors = 0
+
+async def bot_session(index, host, port, unix_path, mode, bot_options, stats):
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(protocol.pack_json(protocol.HELLO, {"mode": mode, "seed": index}))
+    remote = protocol.RemoteState()
+    bot = BotTypist(seed=index, **bot_options)
+    sent = {}
+    seq = 0
+
+    async def type_keys():
+        nonlocal seq
+        loop = asyncio.get_running_loop()
+        next_time = loop.time()
+        while not remote.game_over:
+            remote.advance(TICK)
+            chars = bot(remote)
+            # ไม่มี prediction ฝั่ง client บอทจึงรอให้ server ยืนยันตัวก่อนหน้าแล้วค่อยพิมพ์ต่อ
+            if chars and remote.input_seq == seq:
+                seq += 1
+                sent[seq] = time.perf_counter()
+                writer.write(protocol.pack_keys(seq, "".join(chars)))
+            next_time += TICK
+            await asyncio.sleep(max(0.0, next_time - loop.time()))
+
+    typing = None
+    try:
+        kind, payload = await protocol.read_frame(reader)
+        if kind != protocol.WELCOME:
+            raise ConnectionError(payload.decode('utf-8', 'replace'))
+        stats.connected += 1
+        typing = asyncio.create_task(type_keys())
+        while True:
+            kind, payload = await protocol.read_frame(reader)
+            stats.bytes += len(payload) + protocol.FRAME.size
+            if kind == protocol.DIFF:
+                remote.apply(payload)
+                stats.diffs += 1
+                sent_at = sent.pop(remote.input_seq, None)
+                if sent_at is not None:
+                    stats.key_latency.add((time.perf_counter() - sent_at) * 1000)
+            elif kind == protocol.END:
+                remote.finish(json.loads(payload))
+                stats.finished += 1
+                return
+    except (asyncio.IncompleteReadError, ConnectionError, OSError):
+        stats.errors += 1
+    finally:
+        if typing is not None:
+            typing.cancel()
+        writer.close()
+
+async def load_test(count, host, port, unix_path, mode, duration, bot_options):
+    stats = LoadStats()
+    tasks = [asyncio.create_task(bot_session(i, host, port, unix_path, mode, bot_options, stats)) for i in range(count)]
+    start = time.perf_counter()
+    await asyncio.wait(tasks, timeout=duration)
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(f"[Client] บอท {count} session  เชื่อมต่อได้ {stats.connected}  จบเกม {stats.finished}  error {stats.errors}")
+    print(f"[Client] DIFF {stats.diffs / elapsed:,.0f} ครั้ง/วินาที  {stats.bytes / elapsed / 1024:,.1f} KiB/s")
+    print(f"[Client] key -> DIFF latency  {stats.key_latency.summary()}")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Client ของ Typing Monster Defense server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="เชื่อมต่อผ่าน Unix socket")
+    parser.add_argument("--mode", choices=list(DIFFICULTY_SETTINGS), default="NORMAL")
+    parser.add_argument("--bots", type=int, metavar="N", help="ไม่เปิดหน้าจอ ให้บอท N session เล่นพร้อมกัน")
+    parser.add_argument("--duration", type=float, default=30.0, help="เวลาทดสอบโหลด (วินาที)")
+    parser.add_argument("--wpm", type=float, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.bots:
+        bot_options = {"wpm": args.wpm, "error_rate": args.error_rate}
+        stats = asyncio.run(load_test(args.bots, args.host, args.port, args.unix, args.mode, args.duration, bot_options))
+        sys.exit(0 if stats.connected == args.bots and not stats.errors else 1)
+    else:
+        play(args.host, args.port, args.unix, args.mode)
@@ -0,0 +1,112 @@
+import csv
+import json
+from array import array
+from time import perf_counter_ns
+
+# ==========================================
+# Frame Profiler (จับเวลาแต่ละช่วงของเฟรม)
+# ==========================================
+# เก็บเวลาของแต่ละ phase ต่อเฟรมไว้ใน ring buffer (ขนาดคงที่)
+# ตอนปิดอยู่ทุกเมธอดจะ return ทันที จึงเปิดทิ้งไว้ในเกมจริงได้โดยแทบไม่เสียอะไร
+
+PHASES = ("events", "update", "draw", "present", "wait")
+
+class FrameProfiler:
+    def __init__(self, capacity=600, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.phases = [array('q', [0]) * capacity for _ in PHASES]   # ns ต่อ phase
+        self.totals = array('q', [0]) * capacity
+        self.enemies = array('q', [0]) * capacity
+        self.gc_collections = array('q', [0]) * capacity   # จำนวนครั้งที่ GC ทำงานในเฟรมนั้น
+        self.current_gc = 0
+        self.pos = 0
+        self.count = 0
+        self.frame_start = 0
+        self.last = 0
+        self.current = [0] * len(PHASES)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.last = 0   # เฟรมแรกหลังเปิดยังไม่มี begin_frame ไม่ต้องบันทึก
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last = perf_counter_ns()
+
+    def mark(self, phase):
+        # phase = index ใน PHASES, จับเวลาตั้งแต่ mark ครั้งก่อนถึงตอนนี้
+        if not self.enabled or not self.last:
+            return
+        now = perf_counter_ns()
+        self.current[phase] = now - self.last
+        self.last = now
+
+    def note_gc(self):
+        if self.enabled:
+            self.current_gc += 1
+
+    def end_frame(self, enemy_count=0):
+        if not self.enabled or not self.last:
+            return
+        i = self.pos
+        for phase, column in enumerate(self.phases):
+            column[i] = self.current[phase]
+            self.current[phase] = 0
+        self.totals[i] = self.last - self.frame_start
+        self.enemies[i] = enemy_count
+        self.gc_collections[i] = self.current_gc
+        self.current_gc = 0
+        self.pos = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _ordered(self, column):
+        # ข้อมูลใน ring buffer เรียงจากเก่าไปใหม่
+        if self.count < self.capacity:
+            return list(column[:self.count])
+        return list(column[self.pos:]) + list(column[:self.pos])
+
+    def percentiles(self, points=(50, 95, 99)):
+        """คืน dict ของ frame time (ms) ที่ percentile ต่างๆ"""
+        if not self.count:
+            return {p: 0.0 for p in points}
+        totals = sorted(self.totals[:self.count])
+        return {p: totals[min(len(totals) - 1, len(totals) * p // 100)] / 1e6 for p in points}
+
+    def phase_means(self):
+        """เวลาเฉลี่ย (ms) ของแต่ละ phase"""
+        if not self.count:
+            return {name: 0.0 for name in PHASES}
+        return {name: sum(column[:self.count]) / self.count / 1e6 for name, column in zip(PHASES, self.phases)}
+
+    def gc_frames(self):
+        """จำนวนเฟรมใน buffer ที่มี GC ทำงาน"""
+        return sum(1 for count in self.gc_collections[:self.count] if count)
+
+    def samples(self):
+        columns = [self._ordered(column) for column in self.phases]
+        totals = self._ordered(self.totals)
+        enemies = self._ordered(self.enemies)
+        gc_collections = self._ordered(self.gc_collections)
+        for i in range(self.count):
+            row = {"frame": i, "total_ms": totals[i] / 1e6}
+            for name, column in zip(PHASES, columns):
+                row[f"{name}_ms"] = column[i] / 1e6
+            row["enemies"] = enemies[i]
+            row["gc_collections"] = gc_collections[i]
+            yield row
+
+    def export(self, path):
+        """บันทึกข้อมูลทุกเฟรมใน buffer เป็น .csv หรือ .json (ดูจากนามสกุลไฟล์)"""
+        rows = list(self.samples())
+        if path.lower().endswith(".json"):
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump({"percentiles_ms": self.percentiles(), "phase_means_ms": self.phase_means(),
+                           "frames": rows}, file, indent=1)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=["frame", "total_ms"] + [f"{name}_ms" for name in PHASES] + ["enemies", "gc_collections"])
+                writer.writeheader()
+                writer.writerows(rows)
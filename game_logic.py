@@ -0,0 +1,578 @@
+import heapq
+import random
+import itertools
+
+import word_index
+import word_sampler
+
+try:
+    import numpy as np   # ไม่บังคับ ถ้ามีจะอัปเดตศัตรูทั้งฝูงแบบ vectorised
+except ImportError:
+    np = None
+
+# ==========================================
+# Game Logic (ไม่ต้องใช้ pygame / ไม่ต้องมีหน้าจอ)
+# ==========================================
+# ทุกอย่างที่เป็นกติกาของเกม (เกิดศัตรู, เคลื่อนที่, พิมพ์, คะแนน, HP, เวลา)
+# อยู่ในไฟล์นี้ ส่วน main.py มีหน้าที่แค่รับ Input และวาดหน้าจอ
+# ทำให้รันจำลองเกมแบบ headless ได้เร็วหลายพันรอบต่อวินาที
+
+WIDTH, HEIGHT = 900, 700
+MONSTER_SIZE = 80
+MONSTER_VARIANTS = 3
+START_HP = 3
+
+# --- Fixed timestep ---
+# ตรรกะเกมอัปเดตทีละ tick คงที่ ไม่ขึ้นกับ FPS ของหน้าจอ
+TICK_RATE = 60
+TICK = 1 / TICK_RATE
+MAX_CATCH_UP_STEPS = 5   # จำนวน tick สูงสุดที่ยอมไล่ตามใน 1 เฟรม (กันเกมค้างตอนเครื่องกระตุก)
+
+# หน่วยเป็นต่อวินาที: speed = พิกเซล/วินาที, delay = วินาที
+SPAWN_DELAY_STEP = 0.5 / TICK_RATE   # ลดดีเลย์การเกิดลงทีละนิดทุกครั้งที่มีศัตรูเกิด
+MIN_SPAWN_DELAY = 50 / TICK_RATE
+TIME_EPSILON = 1e-9   # กันค่าทศนิยมสะสม (เช่น 60 * (1/60) ได้ 0.9999...)
+
+DIFFICULTY_SETTINGS = {
+    "EASY": {"min_speed": 12, "max_speed": 30, "start_delay": 2.5, "max_enemies": 5, "time_limit": 300,
+             "word_length": [3, 5], "common_bias": 1.0},
+    "NORMAL": {"min_speed": 36, "max_speed": 72, "start_delay": 5 / 3, "max_enemies": 8, "time_limit": 180,
+               "word_length": [4, 7], "common_bias": 0.5},
+    "HARD": {"min_speed": 60, "max_speed": 120, "start_delay": 1.0, "max_enemies": 12, "time_limit": 120,
+             "word_length": [6, 12], "common_bias": 0.0},
+}
+# key เพิ่มเติมที่ไม่บังคับใส่: "min_delay" (ค่าเริ่มต้น MIN_SPAWN_DELAY), "ramp" (ค่าเริ่มต้น -SPAWN_DELAY_STEP),
+# "start_hp" (ค่าเริ่มต้น START_HP), "waves" (สคริปต์ด่าน ดู GameState._on_wave)
+# และ "unique_letters" (ค่าเริ่มต้น True: ไม่สุ่มคำที่ขึ้นต้นซ้ำกับตัวที่อยู่บนจอ)
+# word_length / common_bias คือช่วงความยาวคำที่ต้องการ และน้ำหนักของคำที่พบบ่อย (ดู word_sampler.py)
+#
+# ตัวอย่าง waves: เวลา "at" เป็นวินาทีนับจากเริ่มเกม
+#   [{"at": 30, "burst": 5, "gap": 0.25},        ศัตรูเกิดติดกัน 5 ตัว ห่างกันตัวละ 0.25 วินาที
+#    {"at": 45, "pause": 5},                     หยุดเกิดตามปกติ 5 วินาที
+#    {"at": 60, "speed": 1.5, "delay": 0.8}]     ตกเร็วขึ้น 1.5 เท่า และเกิดทุก 0.8 วินาที
+
+# ==========================================
+# 1. ข้อมูลศัตรู
+# ==========================================
+class Enemy:
+    """ตัวแทนของศัตรู 1 ตัว ตำแหน่งและความเร็วจริงเก็บอยู่ใน EnemyStore (อ่านผ่าน property)"""
+    __slots__ = ("word", "units", "image_id", "typed_index", "store", "slot")
+    width = MONSTER_SIZE
+    height = MONSTER_SIZE
+
+    def __init__(self, word="", image_id=0, units=None):
+        self.store = None
+        self.slot = -1
+        self.reset(word, image_id, units)
+
+    def reset(self, word, image_id, units=None):
+        # ใช้ตอนดึงออกจาก pool มาเป็นศัตรูตัวใหม่
+        # units = ส่วนที่พิมพ์ได้ของคำ (แยกไว้แล้วตอนโหลด) typed_index นับเป็นจำนวน unit ที่พิมพ์แล้ว
+        self.word = word
+        self.units = units if units is not None else word_index.segment(word)
+        self.image_id = image_id
+        self.typed_index = 0
+
+    @property
+    def x(self):
+        return self.store.x[self.slot]
+
+    @property
+    def y(self):
+        return self.store.y[self.slot]
+
+    @property
+    def prev_y(self):
+        # ตำแหน่งก่อน tick ล่าสุด ใช้ interpolate ตอนวาด
+        return self.store.prev_y[self.slot]
+
+    @property
+    def speed(self):
+        return self.store.speed[self.slot]
+
+# --- Pool ของ Enemy (ใช้ object ซ้ำ ไม่ต้องสร้าง/ทิ้งทุกครั้งที่เกิดหรือตาย) ---
+class EnemyPool:
+    def __init__(self, enemy_class, size):
+        self.enemy_class = enemy_class
+        self.free = [enemy_class() for _ in range(size)]
+
+    def acquire(self, word, image_id, units=None):
+        if self.free:
+            enemy = self.free.pop()
+            enemy.reset(word, image_id, units)
+            return enemy
+        return self.enemy_class(word, image_id, units)
+
+    def release(self, enemy):
+        self.free.append(enemy)
+
+# --- ที่เก็บศัตรูแบบ Struct-of-Arrays ---
+class EnemyStore:
+    """เก็บ x, y, prev_y, speed ของศัตรูทุกตัวเป็นคอลัมน์ (numpy ถ้ามี) ให้อัปเดตทั้งฝูงได้ในคำสั่งเดียว
+    พร้อมดัชนีตามตัวอักษรแรกสำหรับล็อกเป้า"""
+    COLUMNS = ("x", "y", "prev_y", "speed")
+
+    def __init__(self, capacity=16):
+        self.count = 0
+        self.objects = []   # Enemy ตาม slot (ช่องที่ 0..count-1 ใช้งานอยู่)
+        self.buckets = {}   # ตัวอักษรแรก -> ศัตรูที่คำขึ้นต้นด้วยตัวนั้น
+        self.capacity = 0
+        for name in self.COLUMNS:
+            setattr(self, name, np.zeros(0) if np is not None else [])
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            if np is not None:
+                new_column = np.zeros(capacity)
+                new_column[:self.count] = column[:self.count]
+            else:
+                new_column = column + [0.0] * (capacity - self.capacity)
+            setattr(self, name, new_column)
+        self.objects.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def add(self, enemy, x, speed, y=-150):
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        slot = self.count
+        self.x[slot] = x
+        self.y[slot] = y
+        self.prev_y[slot] = y
+        self.speed[slot] = speed
+        self.objects[slot] = enemy
+        enemy.store = self
+        enemy.slot = slot
+        self.count += 1
+        self.buckets.setdefault(enemy.word[0], {})[enemy] = None
+
+    def _unindex(self, enemy):
+        bucket = self.buckets[enemy.word[0]]
+        del bucket[enemy]
+        if not bucket:
+            del self.buckets[enemy.word[0]]
+
+    def remove(self, enemy):
+        # swap-and-pop: ย้ายตัวสุดท้ายมาแทนช่องที่ว่าง O(1)
+        self._unindex(enemy)
+        slot = enemy.slot
+        last = self.count - 1
+        if slot != last:
+            moved = self.objects[last]
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[slot] = column[last]
+            self.objects[slot] = moved
+            moved.slot = slot
+        self.objects[last] = None
+        self.count = last
+        enemy.slot = -1
+
+    def update(self, dt, limit_y):
+        """ขยับศัตรูทั้งหมด แล้วเอาตัวที่เลย limit_y ออก (คืน list ของตัวที่หลุดจอ)"""
+        n = self.count
+        if n == 0:
+            return []
+        if np is None:
+            return self._update_python(dt, limit_y)
+
+        y = self.y[:n]
+        self.prev_y[:n] = y
+        y += self.speed[:n] * dt
+        escaped_mask = y > limit_y
+        if not escaped_mask.any():
+            return []
+
+        # compaction: เก็บเฉพาะตัวที่ยังอยู่ในจอ เรียงลำดับเดิม
+        keep = ~escaped_mask
+        escaped_slots = np.flatnonzero(escaped_mask)
+        escaped = [self.objects[i] for i in escaped_slots]
+        remaining = n - len(escaped)
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:remaining] = column[:n][keep]
+        first = int(escaped_slots[0])
+        survivors = [self.objects[i] for i in range(first, n) if keep[i]]
+        self._reslot(first, survivors, n)
+        for enemy in escaped:
+            self._unindex(enemy)
+            enemy.slot = -1
+        return escaped
+
+    def _update_python(self, dt, limit_y):
+        # ไม่มี numpy: ทำแบบเดียวกันด้วย loop ธรรมดา
+        n = self.count
+        escaped = []
+        survivors = []
+        for i in range(n):
+            self.prev_y[i] = self.y[i]
+            self.y[i] += self.speed[i] * dt
+        first = None
+        for i in range(n):
+            enemy = self.objects[i]
+            if self.y[i] > limit_y:
+                escaped.append(enemy)
+                if first is None:
+                    first = i
+            elif first is not None:
+                survivors.append(enemy)
+                for name in self.COLUMNS:
+                    column = getattr(self, name)
+                    column[first + len(survivors) - 1] = column[i]
+        if first is None:
+            return []
+        self._reslot(first, survivors, n)
+        for enemy in escaped:
+            self._unindex(enemy)
+            enemy.slot = -1
+        return escaped
+
+    def _reslot(self, first, survivors, n):
+        for offset, enemy in enumerate(survivors):
+            self.objects[first + offset] = enemy
+            enemy.slot = first + offset
+        end = first + len(survivors)
+        self.objects[end:n] = [None] * (n - end)
+        self.count = end
+
+    def find_target(self, char):
+        # ถ้ามีหลายตัวขึ้นต้นเหมือนกัน เลือกตัวที่ใกล้พื้นที่สุดก่อน
+        bucket = self.buckets.get(char)
+        if not bucket:
+            return None
+        return max(bucket, key=lambda enemy: enemy.y)
+
+    def __iter__(self):
+        return iter(self.objects[:self.count])
+
+    def __len__(self):
+        return self.count
+
+# ==========================================
+# 2. ตัวจัดเหตุการณ์ตามเวลา (Scheduler)
+# ==========================================
+class Scheduler:
+    """คิวเหตุการณ์เรียงตามเวลาด้วย heapq แต่ละ tick ดึงออกมาเฉพาะเหตุการณ์ที่ถึงเวลาแล้ว
+    ไม่ต้องเช็คตัวนับทุกตัวทุก tick ต่อให้มีเหตุการณ์รออยู่มากแค่ไหนก็ตาม"""
+    def __init__(self):
+        self.queue = []
+        self.order = itertools.count()   # เวลาเท่ากันให้ทำตามลำดับที่ใส่เข้ามา
+
+    def push(self, when, kind, data=None):
+        heapq.heappush(self.queue, (when, next(self.order), kind, data))
+
+    def due(self, now):
+        # เหตุการณ์ที่ handler ใส่เพิ่มระหว่างวนก็ถูกดึงออกมาในรอบเดียวกันถ้าถึงเวลาแล้ว
+        queue = self.queue
+        while queue and queue[0][0] <= now + TIME_EPSILON:
+            when, order, kind, data = heapq.heappop(queue)
+            yield kind, data
+
+    def __len__(self):
+        return len(self.queue)
+
+# ชนิดของเหตุการณ์
+EVENT_SPAWN = "spawn"     # ศัตรูเกิดตามจังหวะปกติ (นัดตัวถัดไปเองทุกครั้ง)
+EVENT_BURST = "burst"     # ศัตรูที่เกิดเพิ่มจาก wave แบบ burst
+EVENT_WAVE = "wave"       # เริ่ม wave ตามสคริปต์ (data = index ใน waves)
+EVENT_CLOCK = "clock"     # ครบวินาที (data = วินาทีที่เท่าไร) นับเวลาถอยหลังและหมดเวลา
+
+# ==========================================
+# 3. สถานะเกม 1 รอบ
+# ==========================================
+class GameState:
+    def __init__(self, settings, words, seed=None, enemy_class=Enemy):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.settings = settings
+        self.words = words
+        self.seed = seed
+        self.rng = random.Random(seed)   # ใช้ RNG ของตัวเองเพื่อให้เล่นซ้ำได้เหมือนเดิม
+        self.enemy_class = enemy_class
+        self.sampler = word_sampler.get_sampler(words, settings)
+        self.units_of = getattr(words, "units", None)   # WordIndex / WordList เก็บ unit ของทุกคำไว้แล้ว
+        self.unique_letters = settings.get("unique_letters", True)
+
+        self.enemies = EnemyStore(settings["max_enemies"])
+        self.pool = EnemyPool(enemy_class, settings["max_enemies"])
+        self.active_enemy = None
+        self.partial = ""   # ตัวอักษรที่พิมพ์ไปแล้วของ unit ปัจจุบัน (unit ภาษาไทยอาจต้องกดหลายครั้ง)
+        # ถ้าตั้งไว้ จะถูกเรียกทุกการกด: key_listener(ตัวที่ควรกด หรือ None, ตัวที่กด, ถูกไหม, เพิ่งล็อกเป้าใหม่)
+        self.key_listener = None
+
+        self.score = 0
+        self.player_hp = settings.get("start_hp", START_HP)
+        self.combo = 0
+        self.max_combo = 0
+        self.total_keystrokes = 0
+        self.correct_keystrokes = 0
+
+        self.spawn_delay = settings["start_delay"]
+        self.min_delay = settings.get("min_delay", MIN_SPAWN_DELAY)
+        self.ramp = settings.get("ramp", -SPAWN_DELAY_STEP)
+        self.speed_scale = 1.0
+        self.paused_until = 0.0
+        self.spawn_blocked = False   # จอเต็มตอนถึงคิวเกิด รอให้มีศัตรูหายไปก่อนค่อยเกิด
+
+        self.ticks = 0
+        self.elapsed = 0.0
+        self.time_left = settings["time_limit"]
+        self.actual_time_played = 0
+        self.game_over = False
+
+        self.waves = settings.get("waves", ())
+        self.events = Scheduler()
+        self.handlers = {EVENT_SPAWN: self._on_spawn, EVENT_BURST: self._on_burst,
+                         EVENT_WAVE: self._on_wave, EVENT_CLOCK: self._on_clock}
+        self.events.push(self.spawn_delay, EVENT_SPAWN)
+        self.events.push(1, EVENT_CLOCK, 1)
+        for index, wave in enumerate(self.waves):
+            self.events.push(wave["at"], EVENT_WAVE, index)
+
+    # --- Input ---
+    def type_char(self, char_pressed):
+        if self.game_over or not word_index.is_typeable(char_pressed):
+            return
+
+        self.total_keystrokes += 1
+
+        target = self.active_enemy
+        new_word = target is None
+        if new_word:
+            target = self.enemies.find_target(char_pressed)
+            if target is None:
+                self.combo = 0
+                if self.key_listener is not None:
+                    self.key_listener(None, char_pressed, False, True)
+                return
+            self.active_enemy = target
+            self.partial = ""
+
+        # เทียบกับ unit ที่ต้องพิมพ์ (unit ส่วนใหญ่มีตัวเดียว ภาษาไทยอาจมีสระ/วรรณยุกต์ซ้อน)
+        typed = self.partial + char_pressed
+        expected_unit = target.units[target.typed_index]
+        if self.key_listener is not None:
+            self.key_listener(expected_unit[len(self.partial)], char_pressed, expected_unit.startswith(typed), new_word)
+        if typed == expected_unit:
+            self.partial = ""
+            self._hit(target)
+        elif expected_unit.startswith(typed):
+            self.partial = typed
+            self._correct()
+        else:
+            self.combo = 0
+
+    def _correct(self):
+        self.correct_keystrokes += 1
+        self.combo += 1
+        if self.combo > self.max_combo: self.max_combo = self.combo
+
+    def _hit(self, enemy):
+        self._correct()
+        enemy.typed_index += 1
+        if enemy.typed_index == len(enemy.units):
+            multiplier = 1 + (self.combo // 10)
+            self.score += (10 * multiplier)
+            self.enemies.remove(enemy)
+            self.pool.release(enemy)
+            self.active_enemy = None
+            self._enemy_left()
+
+    def _enemy_left(self):
+        # มีที่ว่างบนจอแล้ว ถ้าคิวเกิดค้างอยู่ก็ให้เกิดทันที
+        if self.spawn_blocked:
+            self.spawn_blocked = False
+            self.events.push(self.elapsed, EVENT_SPAWN)
+
+    # --- อัปเดต 1 tick ---
+    def step(self, dt, chars=()):
+        for char_pressed in chars:
+            self.type_char(char_pressed)
+        if self.game_over:
+            return
+
+        self.ticks += 1
+        self.elapsed += dt
+        handlers = self.handlers
+        for kind, data in self.events.due(self.elapsed):
+            handlers[kind](data)
+
+        escaped = self.enemies.update(dt, HEIGHT)
+        if escaped:
+            if self.active_enemy in escaped:
+                self.active_enemy = None
+                self.partial = ""
+            for enemy in escaped:
+                self.pool.release(enemy)
+            self._enemy_left()
+
+            self.player_hp -= len(escaped)
+            self.combo = 0
+
+            if self.player_hp <= 0:
+                self.actual_time_played = int(self.elapsed + TIME_EPSILON)
+                self.game_over = True
+
+    # --- เหตุการณ์ ---
+    def _on_spawn(self, data):
+        if self.elapsed + TIME_EPSILON < self.paused_until:
+            self.events.push(self.paused_until, EVENT_SPAWN)
+            return
+        if len(self.enemies) >= self.settings["max_enemies"]:
+            self.spawn_blocked = True
+            return
+        self.spawn_enemy()
+        self.spawn_delay = max(self.min_delay, self.spawn_delay + self.ramp)
+        self.events.push(self.elapsed + self.spawn_delay, EVENT_SPAWN)
+
+    def _on_burst(self, data):
+        # burst ไม่สนใจ pause แต่ถ้าจอเต็มตัวนั้นก็ไม่เกิด
+        if len(self.enemies) < self.settings["max_enemies"]:
+            self.spawn_enemy()
+
+    def _on_wave(self, index):
+        """ทำตามสคริปต์ของ wave: delay / ramp / min_delay (จังหวะเกิด), speed (ตัวคูณความเร็ว),
+        pause (หยุดเกิดกี่วินาที), burst + gap (เกิดเพิ่มกี่ตัว ห่างกันกี่วินาที)"""
+        wave = self.waves[index]
+        if "delay" in wave:
+            self.spawn_delay = wave["delay"]
+        if "ramp" in wave:
+            self.ramp = wave["ramp"]
+        if "min_delay" in wave:
+            self.min_delay = wave["min_delay"]
+        if "speed" in wave:
+            self.speed_scale = wave["speed"]
+        if "pause" in wave:
+            self.paused_until = self.elapsed + wave["pause"]
+        gap = wave.get("gap", 0)
+        for i in range(wave.get("burst", 0)):
+            self.events.push(self.elapsed + i * gap, EVENT_BURST)
+
+    def _on_clock(self, second):
+        self.time_left = self.settings["time_limit"] - second
+        if self.time_left <= 0:
+            self.time_left = 0
+            self.actual_time_played = self.settings["time_limit"]
+            self.game_over = True
+        else:
+            self.events.push(second + 1, EVENT_CLOCK, second + 1)
+
+    def spawn_enemy(self):
+        rng = self.rng
+        index = self.sampler.sample_index(rng, self.enemies.buckets if self.unique_letters else ())
+        random_x = rng.randint(50, WIDTH - 150)
+        random_speed = rng.uniform(self.settings["min_speed"], self.settings["max_speed"]) * self.speed_scale
+        image_id = rng.randrange(MONSTER_VARIANTS)
+        units = self.units_of(index) if self.units_of is not None else None
+        enemy = self.pool.acquire(self.words[index], image_id, units)
+        self.enemies.add(enemy, random_x, random_speed)
+        return enemy
+
+    # --- สรุปผล ---
+    def accuracy(self):
+        if self.total_keystrokes > 0:
+            return (self.correct_keystrokes / self.total_keystrokes) * 100
+        return 0
+
+    def wpm(self):
+        played_minutes = self.actual_time_played / 60.0
+        if played_minutes > 0:
+            return (self.correct_keystrokes / 5) / played_minutes
+        return 0
+
+class FixedTimestep:
+    """สะสมเวลาจริงของแต่ละเฟรม แล้วแปลงเป็นจำนวน tick คงที่ที่ต้องอัปเดต"""
+    def __init__(self, step=TICK, max_steps=MAX_CATCH_UP_STEPS):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, frame_dt):
+        self.accumulator += frame_dt
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            # ตามไม่ทันจริงๆ ก็ทิ้งเวลาส่วนเกิน ให้เกมช้าลงชั่วคราวแทนการค้าง
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        # สัดส่วนระหว่าง tick ล่าสุดกับ tick ถัดไป (0-1) ใช้ interpolate ตอนวาด
+        return self.accumulator / self.step
+
+    def reset(self):
+        self.accumulator = 0.0
+
+# ==========================================
+# 4. จำลองเกมแบบ Headless
+# ==========================================
+def simulate(settings, words, seed, input_fn=None, dt=TICK, max_ticks=None):
+    """รันเกม 1 รอบจนจบโดยไม่มีหน้าจอ input_fn(state) คืนตัวอักษรที่พิมพ์ใน tick นั้น"""
+    state = GameState(settings, words, seed)
+    while not state.game_over:
+        if max_ticks is not None and state.ticks >= max_ticks:
+            break
+        chars = input_fn(state) if input_fn else ()
+        state.step(dt, chars)
+    return state
+
+# ==========================================
+# 5. บอทพิมพ์อัตโนมัติ (ใช้ทดสอบประสิทธิภาพ / จำลองผู้เล่น)
+# ==========================================
+BOT_STRATEGIES = ("lowest", "shortest", "random")
+BOT_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+class BotTypist:
+    """ผู้เล่นจำลองที่พิมพ์ด้วยความเร็ว wpm คงที่และพิมพ์ผิดตามสัดส่วน error_rate
+    เรียก bot(state) 1 ครั้งต่อ tick จะได้ตัวอักษรที่ต้องส่งเข้า type_char ใน tick นั้น (ใช้เป็น input_fn ของ simulate ได้)
+    strategy: lowest = ตัวที่ใกล้พื้นที่สุด, shortest = คำสั้นที่สุด, random = สุ่ม"""
+    def __init__(self, wpm=60, error_rate=0.05, strategy="lowest", seed=0, dt=TICK):
+        if strategy not in BOT_STRATEGIES:
+            raise ValueError(f"ไม่รู้จัก strategy {strategy!r} (มี {', '.join(BOT_STRATEGIES)})")
+        self.wpm = wpm
+        self.error_rate = error_rate
+        self.strategy = strategy
+        self.interval = 60 / (wpm * 5)   # 1 คำ = 5 ตัวอักษร นิยามเดียวกับ GameState.wpm()
+        self.dt = dt
+        self.rng = random.Random(seed)
+        self.clock = 0.0
+
+    def choose_target(self, state):
+        if not len(state.enemies):
+            return None
+        if self.strategy == "lowest":
+            return max(state.enemies, key=lambda enemy: enemy.y)
+        if self.strategy == "shortest":
+            return min(state.enemies, key=lambda enemy: len(enemy.word))
+        return self.rng.choice(list(state.enemies))
+
+    def __call__(self, state):
+        self.clock += self.dt
+        chars = []
+        target = state.active_enemy
+        index = 0   # ตำแหน่งตัวอักษรใน word (unit หนึ่งอาจมีหลายตัวอักษร)
+        if target is not None:
+            index = len("".join(target.units[:target.typed_index])) + len(getattr(state, "partial", ""))
+        while self.clock >= self.interval:
+            if target is None:
+                target = self.choose_target(state)
+                if target is None:
+                    # ไม่มีศัตรูให้พิมพ์ ไม่สะสมเวลาไว้พิมพ์รวดเดียวตอนศัตรูเกิด
+                    self.clock = 0.0
+                    break
+                index = 0
+            self.clock -= self.interval
+            expected_char = target.word[index]
+            if self.rng.random() < self.error_rate:
+                chars.append(self.rng.choice(BOT_LETTERS.replace(expected_char, "")))
+                continue
+            chars.append(expected_char)
+            index += 1
+            if index == 1 or index == len(target.word):
+                # เริ่มคำใหม่ (เกมอาจล็อกตัวอื่นที่ขึ้นต้นเหมือนกัน) หรือพิมพ์จบคำ ให้ดู state ใหม่ใน tick หน้า
+                break
+        return chars
@@ -1,16 +1,34 @@
+import time
+IMPORT_START = time.perf_counter()
+
 import pygame
-import random
 import sys
 import os
+import gc
+import json
+import argparse
+import threading
+from collections import OrderedDict
+
+import game_logic
+import word_index
+import word_sampler
+import replay
+import stats_store
+from frame_profiler import FrameProfiler
+from game_logic import WIDTH, HEIGHT, MONSTER_SIZE, DIFFICULTY_SETTINGS, GameState, FixedTimestep
 
 # ==========================================
 # 1. ตั้งค่าพื้นฐานของเกม
 # ==========================================
-pygame.init()
-WIDTH, HEIGHT = 900, 700
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Typing Monster Defense (Final Version)")
+# หน้าจอและฟอนต์จะถูกสร้างตอนเริ่ม main() (ดู init_display / load_fonts)
+screen = None
 clock = pygame.time.Clock()
+FPS_LIMIT = 60   # 0 = ไม่จำกัด FPS (ความเร็วเกมไม่เปลี่ยน เพราะตรรกะใช้ fixed timestep)
+IDLE_TIMEOUT_MS = 250   # หน้าจอนิ่ง (เมนู/หยุดเกม/จบเกม) ตื่นมาเช็คอย่างน้อยทุกๆ เท่านี้
+STATS_FILE = "stats.db"   # สถิติการพิมพ์ข้ามรอบ (ดู stats_store.py)
+# โหมดฝึก: ความเร็วแบบ NORMAL แต่สุ่มจากคำที่มีตัวอักษรที่พลาด/ช้าบ่อย
+PRACTICE_SETTINGS = dict(DIFFICULTY_SETTINGS["NORMAL"], time_limit=120, word_length=[3, 8], common_bias=0.0)
 
 # --- สี ---
 BLACK = (20, 20, 20)
@@ -36,138 +54,638 @@ HOVER_HELP = (80, 200, 255)
 BTN_GRAY = (100, 100, 100)  
 HOVER_GRAY = (150, 150, 150)
 
+# --- เวลาที่ใช้ในแต่ละขั้นตอนตอนเปิดเกม (--profile-startup) ---
+class StartupProfiler:
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.stages = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.stages.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        print("[Startup] เวลาที่ใช้แต่ละขั้นตอน")
+        for name, seconds in self.stages:
+            print(f"[Startup]   {name:<20} {seconds * 1000:8.1f} ms")
+        print(f"[Startup]   {'total':<20} {(self.last - self.start) * 1000:8.1f} ms")
+
+startup = StartupProfiler(IMPORT_START)
+
+def init_display():
+    global screen
+    # init เฉพาะส่วนที่ใช้ (ไม่ต้องเปิดระบบเสียง/จอยสติ๊ก)
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Typing Monster Defense (Final Version)")
+
 # --- ฟอนต์ภาษาไทย ---
-try:
-    font = pygame.font.SysFont("tahoma", 24, bold=True)
-    ui_font = pygame.font.SysFont("tahoma", 20, bold=True)
-    title_font = pygame.font.SysFont("tahoma", 42, bold=True)
-    inst_font = pygame.font.SysFont("tahoma", 24)
-except:
-    font = pygame.font.SysFont('arial', 24, bold=True)
-    ui_font = pygame.font.SysFont('arial', 20)
-    title_font = pygame.font.SysFont('arial', 42, bold=True)
-    inst_font = pygame.font.SysFont('arial', 24)
+# SysFont ต้องสแกนฟอนต์ทั้งเครื่องทุกครั้งที่เปิดเกม จึงจำ path ที่หาเจอไว้ในไฟล์
+FONT_NAMES = "tahoma,arial"
+FONT_CACHE_FILE = "font_cache.json"
+font = ui_font = title_font = inst_font = None
+
+def load_font_cache():
+    try:
+        with open(resource_path(FONT_CACHE_FILE), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_font_cache(cache):
+    try:
+        with open(resource_path(FONT_CACHE_FILE), 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+    except OSError:
+        pass   # เขียนไม่ได้ก็แค่สแกนใหม่ครั้งหน้า
+
+def make_font(cache, size, bold=False):
+    key = f"{FONT_NAMES}|{'bold' if bold else 'regular'}"
+    entry = cache.get(key)
+    if entry is not None and entry[0] is not None and os.path.exists(entry[0]):
+        font_path, fake_bold = entry
+        new_font = pygame.font.Font(font_path, size)
+        new_font.set_bold(fake_bold)
+        return new_font
+
+    resolved = []
+    def constructor(font_path, font_size, set_bold, set_italic):
+        resolved.append((font_path, set_bold))
+        new_font = pygame.font.Font(font_path, font_size)
+        new_font.set_bold(set_bold)
+        return new_font
+
+    new_font = pygame.font.SysFont(FONT_NAMES, size, bold=bold, constructor=constructor)
+    if resolved[0][0] is not None:
+        cache[key] = list(resolved[0])
+    # หาไม่เจอ (ได้ฟอนต์ default) ไม่จำไว้ ครั้งหน้าจะสแกนใหม่ เผื่อเพิ่งติดตั้งฟอนต์ หรือสแกนรอบนี้ล้มเหลว
+    return new_font
+
+def load_fonts():
+    global font, ui_font, title_font, inst_font
+    cache = load_font_cache()
+    cached_keys = len(cache)
+    font = make_font(cache, 24, bold=True)
+    ui_font = make_font(cache, 20, bold=True)
+    title_font = make_font(cache, 42, bold=True)
+    inst_font = make_font(cache, 24)
+    if len(cache) != cached_keys:
+        save_font_cache(cache)
+
+# --- Cache ข้อความที่ render แล้ว (LRU) ---
+class TextCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, color, text_font):
+        key = (text, color, text_font)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = text_font.render(text, True, color).convert_alpha()
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+text_cache = TextCache()
+
+# --- ระบบอัปเดตหน้าจอเฉพาะส่วนที่เปลี่ยน (Dirty Rects) ---
+class DirtyRectTracker:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.screen_rect = pygame.Rect(0, 0, WIDTH, HEIGHT)
+        self.prev = {}   # key -> (rect, sig) ของเฟรมที่แล้ว
+        self.curr = {}
+        self.rects = []
+        self.full_redraw = True
+        self.pixels_updated = 0   # จำนวนพิกเซลที่ส่งขึ้นจอในเฟรมล่าสุด
+
+    def mark(self, key, rect, sig=None):
+        # บันทึกชิ้นส่วนที่วาดในเฟรมนี้ ถ้าตำแหน่งหรือหน้าตา (sig) ต่างจากเฟรมที่แล้วถือว่า dirty
+        if not self.enabled:
+            return   # โหมด flip ทั้งจอไม่ต้องใช้ข้อมูลนี้
+        rect = pygame.Rect(rect).inflate(2, 2)
+        entry = (rect, sig)
+        self.curr[key] = entry
+        old = self.prev.get(key)
+        if old is None:
+            self.rects.append(rect)
+        elif old != entry:
+            self.rects.append(old[0])
+            self.rects.append(rect)
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def present(self):
+        if not self.enabled or self.full_redraw:
+            pygame.display.flip()
+            self.pixels_updated = WIDTH * HEIGHT
+        else:
+            # ชิ้นที่เฟรมที่แล้วมี แต่เฟรมนี้หายไป ต้องลบออกจากจอด้วย
+            for key, (rect, sig) in self.prev.items():
+                if key not in self.curr:
+                    self.rects.append(rect)
+            rects = [rect.clip(self.screen_rect) for rect in self.rects]
+            rects = [rect for rect in rects if rect.width and rect.height]
+            if rects:
+                pygame.display.update(rects)
+            self.pixels_updated = sum(rect.width * rect.height for rect in rects)
+
+        self.prev, self.curr = self.curr, {}
+        self.rects = []
+        self.full_redraw = False
 
 # ==========================================
 # 2. ระบบดึงคำศัพท์จากไฟล์ (File I/O)
 # ==========================================
 WORD_LIST = ["python", "project", "coding", "game", "keyboard"] # คำศัพท์สำรอง
 
-def load_words(filename):
-    words = []
+def resource_path(filename):
+    # เช็คว่าเกมรันแบบไฟล์ .exe หรือแบบสคริปต์ปกติ
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable) # ดึง Path ของโฟลเดอร์ที่ .exe วางอยู่
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__)) # ดึง Path ปกติ
+    return os.path.join(base_dir, filename)
+
+def load_words(filename, progress=None):
     try:
-        # เช็คว่าเกมรันแบบไฟล์ .exe หรือแบบสคริปต์ปกติ
-        if getattr(sys, 'frozen', False):
-            base_dir = os.path.dirname(sys.executable) # ดึง Path ของโฟลเดอร์ที่ .exe วางอยู่
-        else:
-            base_dir = os.path.dirname(os.path.abspath(__file__)) # ดึง Path ปกติ
-            
-        file_path = os.path.join(base_dir, filename)
-        
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                clean_word = line.strip().lower()
-                if clean_word and clean_word.isalpha():
-                    words.append(clean_word)
+        file_path = resource_path(filename)
+        # ใช้ไฟล์ index ที่ compile ไว้แล้ว (words.txt.idx) ถ้ายังตรงกับ words.txt
+        words = word_index.load_or_build(file_path, progress=progress)
         print(f"[System] สำเร็จ! ดึงคำศัพท์มาได้ {len(words)} คำจาก {file_path}")
         return words
     except FileNotFoundError:
         print(f"[Warning] หาไฟล์ {filename} ไม่เจอ! กำลังใช้คำศัพท์สำรอง")
         return None
+    except (OSError, ValueError) as error:
+        # เช่นไฟล์ไม่ใช่ UTF-8 (UnicodeDecodeError) หรืออ่านไฟล์ไม่ได้
+        print(f"[Warning] อ่านไฟล์ {filename} ไม่ได้ ({error}) กำลังใช้คำศัพท์สำรอง")
+        return None
 
-# โหลดคำศัพท์ตอนเริ่มเกม
-loaded_words = load_words('words.txt')
-if loaded_words:
-    WORD_LIST = loaded_words
+class WordLoader:
+    """โหลดคำศัพท์ใน background thread ระหว่างที่หน้าเมนูแสดงอยู่"""
+    def __init__(self, filename):
+        self.filename = filename
+        self.progress = 0.0
+        self.done = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        global WORD_LIST
+        try:
+            loaded_words = load_words(self.filename, progress=self._set_progress)
+            if loaded_words:
+                # สร้างตารางสุ่มคำของทุกโหมดไว้ก่อน ตอนกดเริ่มเกมจะได้ไม่ต้องรอ
+                word_sampler.prepare(loaded_words, DIFFICULTY_SETTINGS.values())
+                WORD_LIST = loaded_words   # เกมที่เริ่มก่อนโหลดเสร็จจะใช้คำศัพท์สำรองไปก่อน
+        finally:
+            # ผิดพลาดแบบไหนก็ต้องบอกเมนูว่าโหลดจบแล้ว ไม่อย่างนั้นจะขึ้น "กำลังโหลด" ค้างตลอด
+            self.progress = 1.0
+            self.done = True
+
+    def _set_progress(self, value):
+        self.progress = value
 
 # ==========================================
 # 3. ส่วนเตรียม Asset (รูปภาพมอนสเตอร์)
 # ==========================================
-def create_placeholder_monster(color):
-    surf = pygame.Surface((80, 80))
+def create_placeholder_monster(surf, color):
     surf.fill(color)
     pygame.draw.rect(surf, WHITE, (15, 20, 10, 10))
     pygame.draw.rect(surf, WHITE, (55, 20, 10, 10))
-    return surf
 
-monster_images = [
-    create_placeholder_monster(RED),
-    create_placeholder_monster((50, 100, 255)),
-    create_placeholder_monster((100, 255, 50)),
-]
+MONSTER_COLORS = [RED, (50, 100, 255), (100, 255, 50)]
+monster_atlas = None   # รูปมอนสเตอร์ทุกแบบรวมอยู่ใน surface เดียว (แปลง format ให้ตรงกับจอแล้ว)
+monster_areas = []     # ตำแหน่งของแต่ละแบบใน atlas
+
+def load_monster_images():
+    # สร้างตอนเริ่มเล่นรอบแรก ไม่ต้องเสียเวลาตอนเปิดเกม
+    global monster_atlas
+    if monster_atlas is None:
+        atlas = pygame.Surface((MONSTER_SIZE * len(MONSTER_COLORS), MONSTER_SIZE))
+        for i, color in enumerate(MONSTER_COLORS):
+            area = pygame.Rect(i * MONSTER_SIZE, 0, MONSTER_SIZE, MONSTER_SIZE)
+            create_placeholder_monster(atlas.subsurface(area), color)
+            monster_areas.append(area)
+        monster_atlas = atlas.convert()
+    return monster_areas
+
+# --- กล่องป้ายคำ (render ไว้ล่วงหน้าตามช่วงความกว้าง) ---
+LABEL_BUCKET = 8   # ปัดความกว้างกล่องขึ้นเป็นทวีคูณของค่านี้ จะได้ใช้กล่องร่วมกันได้หลายคำ
+label_boxes = {}
+
+def get_label_box(width, height, is_active):
+    key = (width, height, is_active)
+    box = label_boxes.get(key)
+    if box is None:
+        box = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(box, GRAY_BOX, box.get_rect(), border_radius=8)
+        if is_active:
+            pygame.draw.rect(box, YELLOW_TARGET, box.get_rect(), width=2, border_radius=8)
+        box = box.convert_alpha()
+        label_boxes[key] = box
+    return box
 
 # ==========================================
 # 4. Class ศัตรู
 # ==========================================
-class Enemy:
-    def __init__(self, word, x, speed, image):
-        self.word = word
-        self.image = image
-        self.width = self.image.get_width()
-        self.height = self.image.get_height()
-        self.x = x
-        self.y = -150
-        self.speed = speed
-        self.typed_index = 0
-
-    def update(self):
-        self.y += self.speed
-
-    def draw(self, surface, is_active):
-        surface.blit(self.image, (self.x, self.y))
+class Enemy(game_logic.Enemy):
+    __slots__ = ("image_area", "label_key", "label")
+
+    def reset(self, word, image_id, units=None):
+        super().reset(word, image_id, units)
+        self.image_area = load_monster_images()[image_id]
+        self.label_key = None
+        self.label = None
+
+    def _build_label(self, is_active):
         box_margin = 5
-        box_y = self.y + self.height + 10
-        
-        typed_str = self.word[:self.typed_index]
-        untyped_str = self.word[self.typed_index:]
-        
-        typed_text_surf = font.render(typed_str, True, GREEN_TYPED)
+        # แบ่งสีได้เฉพาะระหว่าง unit (สระ/วรรณยุกต์ไม่หลุดจากพยัญชนะ) แต่ละช่วงถูก cache ไว้ใน text_cache
+        typed_str = "".join(self.units[:self.typed_index])
+        untyped_str = self.word[len(typed_str):]
         untyped_color = YELLOW_TARGET if is_active else WHITE
-        untyped_text_surf = font.render(untyped_str, True, untyped_color)
-        
+        typed_text_surf = text_cache.render(typed_str, GREEN_TYPED, font)
+        untyped_text_surf = text_cache.render(untyped_str, untyped_color, font)
+
         total_text_width = typed_text_surf.get_width() + untyped_text_surf.get_width()
         text_height = typed_text_surf.get_height()
 
         box_width = total_text_width + (box_margin * 4)
+        box_width = -(-box_width // LABEL_BUCKET) * LABEL_BUCKET
         box_height = text_height + (box_margin * 2)
-        box_x = self.x + (self.width / 2) - (box_width / 2)
-
-        box_rect = pygame.Rect(box_x, box_y, box_width, box_height)
-        pygame.draw.rect(surface, GRAY_BOX, box_rect, border_radius=8)
-        
-        if is_active:
-            pygame.draw.rect(surface, YELLOW_TARGET, box_rect, width=2, border_radius=8)
-
-        text_start_x = box_x + (box_width - total_text_width) / 2
-        text_start_y = box_y + box_margin
-
-        surface.blit(typed_text_surf, (text_start_x, text_start_y))
-        surface.blit(untyped_text_surf, (text_start_x + typed_text_surf.get_width(), text_start_y))
+        box = get_label_box(box_width, box_height, is_active)
+
+        # ตำแหน่งทุกอย่างเทียบกับมุมซ้ายบนของรูปมอนสเตอร์
+        box_dx = self.width // 2 - box_width // 2
+        box_dy = self.height + 10
+        text_dx = box_dx + (box_width - total_text_width) // 2
+        text_dy = box_dy + box_margin
+        return (box, box_dx, box_dy, typed_text_surf, untyped_text_surf, text_dx, text_dy)
+
+    def draw(self, batch, is_active, alpha=1.0):
+        """เพิ่มรายการ blit ของศัตรูตัวนี้ลงใน batch (วาดทีเดียวด้วย Surface.blits) คืน rect ที่ครอบทั้งหมด"""
+        # สร้าง label ใหม่เฉพาะตอนที่พิมพ์คืบหน้าหรือสถานะล็อกเป้าเปลี่ยน
+        label_key = (self.typed_index, is_active)
+        if self.label_key != label_key:
+            self.label = self._build_label(is_active)
+            self.label_key = label_key
+        box, box_dx, box_dy, typed_text_surf, untyped_text_surf, text_dx, text_dy = self.label
+
+        # interpolate ระหว่างตำแหน่ง tick ก่อนหน้ากับ tick ล่าสุด ให้ภาพลื่นทุก FPS
+        x = int(self.x)
+        y = int(self.prev_y + (self.y - self.prev_y) * alpha)
+        batch.append((monster_atlas, (x, y), self.image_area))
+        batch.append((box, (x + box_dx, y + box_dy)))
+        batch.append((typed_text_surf, (x + text_dx, y + text_dy)))
+        batch.append((untyped_text_surf, (x + text_dx + typed_text_surf.get_width(), y + text_dy)))
+
+        sprite_rect = pygame.Rect(x, y, self.width, self.height)
+        return sprite_rect.union(pygame.Rect(x + box_dx, y + box_dy, box.get_width(), box.get_height()))
 
 # ==========================================
-# 5. Game Loop และระบบ State
+# 5. หน้าจอนิ่ง (Layer ที่ render ไว้ล่วงหน้า)
 # ==========================================
-def main():
-    game_state = "MENU"
-    difficulty_settings = {}
+class Button:
+    def __init__(self, rect, color, hover_color, text, text_font, text_color, border_radius=10, text_offset=None):
+        self.rect = rect
+        self.text = text
+        # render ปุ่มทั้งสองสถานะไว้ครั้งเดียว ตอนวาดแค่ blit
+        self.normal = self._build(color, text_font, text_color, border_radius, text_offset)
+        self.hover = self._build(hover_color, text_font, text_color, border_radius, text_offset)
+
+    def _build(self, color, text_font, text_color, border_radius, text_offset):
+        surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        pygame.draw.rect(surf, color, surf.get_rect(), border_radius=border_radius)
+        btn_text = text_font.render(self.text, True, text_color)
+        if text_offset is None:
+            text_offset = (self.rect.width // 2 - btn_text.get_width() // 2, self.rect.height // 2 - btn_text.get_height() // 2)
+        surf.blit(btn_text, text_offset)
+        return surf.convert_alpha()
+
+    def draw(self, surface, mouse_pos):
+        hovered = self.rect.collidepoint(mouse_pos)
+        surface.blit(self.hover if hovered else self.normal, self.rect)
+        return hovered
+
+class LayerCache:
+    def __init__(self):
+        self.layers = {}   # ชื่อ layer -> (key, surface)
+
+    def get(self, name, key, build):
+        # สร้าง layer ใหม่เฉพาะตอนที่ข้อมูลที่ใช้สร้าง (key) เปลี่ยน
+        cached = self.layers.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, build())
+            self.layers[name] = cached
+        return cached[1]
+
+def new_layer():
+    layer = pygame.Surface((WIDTH, HEIGHT)).convert()
+    layer.fill(BLACK)
+    return layer
+
+def build_menu_layer():
+    layer = new_layer()
+    title_text = title_font.render("TYPING MONSTER DEFENSE", True, WHITE)
+    subtitle_text = ui_font.render("Select Difficulty to Start", True, YELLOW_TARGET)
+    layer.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//4 - 40))
+    layer.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, HEIGHT//4 + 30))
+    return layer
+
+def build_help_layer():
+    layer = new_layer()
+    help_title = title_font.render("วิธีเล่น (HOW TO PLAY)", True, YELLOW_TARGET)
+    layer.blit(help_title, (WIDTH//2 - help_title.get_width()//2, 80))
+
+    instructions = [
+        "1. พิมพ์ตัวอักษรให้ตรงกับคำบนตัวมอนสเตอร์เพื่อทำลายพวกมัน",
+        "2. ตัวอักษรแรกที่คุณพิมพ์ จะเป็นการ 'ล็อกเป้าหมาย' (ขึ้นกรอบสีเหลือง)",
+        "3. การพิมพ์ถูกต่อเนื่องจะเพิ่ม COMBO ทำให้ได้คะแนนคูณ 2, คูณ 3!",
+        "4. ถ้ามอนสเตอร์หลุดจอ 1 ตัว จะเสียหัวใจ 1 ดวง (มีทั้งหมด 3 ดวง)",
+        "5. พยายามทำความแม่นยำและเอาตัวรอดให้ได้นานที่สุด!"
+    ]
+    
+    for i, text in enumerate(instructions):
+        inst_text = inst_font.render(text, True, WHITE)
+        layer.blit(inst_text, (80, 200 + (i * 65)))
+    return layer
+
+def build_history_layer(stats):
+    # อ่านจาก sessions ล่าสุด + ตารางสรุป (letter_stats / bigram_stats) เท่านั้น
+    layer = new_layer()
+    history_title = title_font.render("สถิติ (HISTORY)", True, YELLOW_TARGET)
+    layer.blit(history_title, (WIDTH//2 - history_title.get_width()//2, 40))
+
+    sessions = stats.history(10)
+    layer.blit(font.render("10 รอบล่าสุด", True, BLUE_MENU), (40, 120))
+    if not sessions:
+        layer.blit(ui_font.render("ยังไม่มีประวัติ เล่นให้จบสักรอบก่อน", True, GRAY_BOX), (40, 165))
+    for i, (started, mode, score, accuracy, wpm) in enumerate(sessions):
+        line = f"{time.strftime('%d/%m %H:%M', time.localtime(started))}  {mode:<8} {score:>6}  {int(wpm):>3} WPM  {accuracy:.0f}%"
+        layer.blit(ui_font.render(line, True, WHITE), (40, 165 + i * 36))
+
+    y = 120
+    for title, table, key in (("ตัวอักษรที่ต้องฝึก", "letter_stats", "letter"), ("คู่ตัวอักษรที่ต้องฝึก", "bigram_stats", "bigram")):
+        layer.blit(font.render(title, True, ORANGE), (560, y))
+        y += 45
+        for name, latency, error_rate in (row[:3] for row in stats.weakest(table, key, 5)):
+            line = f"{name:<3} {latency:4.0f} ms  ผิด {error_rate * 100:.0f}%"
+            layer.blit(ui_font.render(line, True, WHITE), (580, y))
+            y += 32
+        y += 20
+    return layer
+
+def build_game_over_layer(game):
+    layer = new_layer()
+    accuracy = game.accuracy()
+    wpm = game.wpm()
+
+    go_title = title_font.render("GAME OVER!" if game.player_hp <= 0 else "TIME'S UP!", True, RED if game.player_hp <= 0 else YELLOW_TARGET)
+    go_score = title_font.render(f"Final Score: {game.score}", True, WHITE)
+    
+    stat_combo = font.render(f"Max Combo: {game.max_combo}", True, ORANGE)
+    stat_acc = font.render(f"Accuracy: {accuracy:.1f}%", True, GREEN_TYPED)
+    stat_wpm = font.render(f"Typing Speed: {int(wpm)} WPM", True, BLUE_MENU)
     
-    enemies = []
-    active_enemy = None
+    restart_text = ui_font.render("Press 'R' to return to Menu", True, GRAY_BOX)
     
-    score = 0
-    player_hp = 3
-    combo = 0
-    max_combo = 0
-    total_keystrokes = 0
-    correct_keystrokes = 0
+    layer.blit(go_title, (WIDTH//2 - go_title.get_width()//2, 100))
+    layer.blit(go_score, (WIDTH//2 - go_score.get_width()//2, 180))
     
-    spawn_timer = 0
-    spawn_delay = 100
+    layer.blit(stat_combo, (WIDTH//2 - stat_combo.get_width()//2, 280))
+    layer.blit(stat_acc, (WIDTH//2 - stat_acc.get_width()//2, 330))
+    layer.blit(stat_wpm, (WIDTH//2 - stat_wpm.get_width()//2, 380))
     
-    start_ticks = 0
-    pause_start_ticks = 0
-    time_left = 0
-    actual_time_played = 0
+    layer.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT - 100))
+    return layer
+
+pause_overlay = None
+
+def get_pause_overlay():
+    global pause_overlay
+    if pause_overlay is None:
+        pause_overlay = pygame.Surface((WIDTH, HEIGHT)).convert()
+        pause_overlay.set_alpha(180)
+        pause_overlay.fill((0, 0, 0))
+    return pause_overlay
+
+def draw_playfield(surface, game, alpha, dirty):
+    batch = []
+    track = dirty.enabled   # ไม่ใช้ dirty rects ก็ไม่ต้องเรียก mark ทีละตัว (ศัตรูเป็นพันตัวต่อเฟรม)
+    # --- แก้ไข Z-Index ตรงนี้ ---
+    # 1. วาดมอนสเตอร์ที่ยังไม่โดนล็อกเป้าไว้เป็นฉากหลังก่อน
+    for enemy in game.enemies:
+        if enemy != game.active_enemy:
+            enemy_rect = enemy.draw(batch, False, alpha)
+            if track:
+                dirty.mark(enemy, enemy_rect, (enemy.typed_index, False))
+    
+    # 2. วาดมอนสเตอร์เป้าหมายหลักทีหลัง เพื่อให้อยู่ข้างหน้าสุดเสมอ (ลำดับใน batch = ลำดับการวาด)
+    if game.active_enemy is not None:
+        enemy_rect = game.active_enemy.draw(batch, True, alpha)
+        dirty.mark(game.active_enemy, enemy_rect, (game.active_enemy.typed_index, True))
+    # ---------------------------
+    if batch:
+        surface.blits(batch, doreturn=False)
+
+    score_text = text_cache.render(f"Score: {game.score}", WHITE, ui_font)
+    dirty.mark("score", surface.blit(score_text, (20, 20)), score_text)
+    
+    if game.combo > 1:
+        multiplier = 1 + (game.combo // 10)
+        combo_str = f"Combo: {game.combo} (x{multiplier})"
+        combo_text = text_cache.render(combo_str, ORANGE, font)
+        dirty.mark("combo", surface.blit(combo_text, (20, 50)), combo_text)
+
+    minutes = game.time_left // 60
+    seconds = game.time_left % 60
+    time_str = f"{minutes:02d}:{seconds:02d}"
+    time_color = RED if game.time_left <= 30 else GREEN_TYPED 
+    timer_text = text_cache.render(f"Time: {time_str}", time_color, ui_font)
+    dirty.mark("timer", surface.blit(timer_text, (WIDTH - 150, 20)), timer_text)
+    
+    hp_text = text_cache.render(f"HP: {'♥ ' * game.player_hp}", RED, ui_font)
+    dirty.mark("hp", surface.blit(hp_text, (WIDTH - 150, 50)), hp_text)
+
+def build_pause_layer(game, alpha):
+    # ตอน Pause ฉากเกมไม่ขยับ จึงวาดฉากเกม + overlay + หัวข้อรวมไว้ครั้งเดียว
+    layer = new_layer()
+    draw_playfield(layer, game, alpha, DirtyRectTracker())
+    layer.blit(get_pause_overlay(), (0, 0))
+    pause_title = title_font.render("หยุดเกมชั่วคราว", True, YELLOW_TARGET)
+    layer.blit(pause_title, (WIDTH//2 - pause_title.get_width()//2, HEIGHT//3 - 30))
+    return layer
+
+# --- หน้าต่างข้อมูล Profiler (กด F3) ---
+class ProfilerOverlay:
+    REFRESH_FRAMES = 15   # ตัวเลขเปลี่ยนทุกเฟรม จึง render ใหม่เป็นช่วงๆ แทน
+
+    def __init__(self):
+        self.surface = None
+        self.frames = 0
+        self.debug_font = None
+
+    def draw(self, surface, profiler, lines):
+        if self.surface is None or self.frames >= self.REFRESH_FRAMES:
+            self.surface = self._build(profiler, lines)
+            self.frames = 0
+        self.frames += 1
+        return surface.blit(self.surface, (WIDTH // 2 - self.surface.get_width() // 2, 10))
+
+    def _build(self, profiler, lines):
+        if self.debug_font is None:
+            self.debug_font = pygame.font.Font(None, 20)
+        pct = profiler.percentiles()
+        means = profiler.phase_means()
+        all_lines = [
+            f"frame ms  p50 {pct[50]:.2f}  p95 {pct[95]:.2f}  p99 {pct[99]:.2f}",
+            "  ".join(f"{name} {ms:.2f}" for name, ms in means.items()),
+        ] + lines
+        rendered = [self.debug_font.render(line, True, GREEN_TYPED) for line in all_lines]
+        width = max(text.get_width() for text in rendered) + 16
+        height = sum(text.get_height() for text in rendered) + 12
+        panel = pygame.Surface((width, height)).convert()
+        panel.fill((0, 0, 0))
+        y = 6
+        for text in rendered:
+            panel.blit(text, (8, y))
+            y += text.get_height()
+        return panel
+
+# --- ควบคุม Garbage Collector ---
+class GCPolicy:
+    """ปิด GC อัตโนมัติระหว่างเล่น แล้วไปเก็บกวาดตอนอยู่หน้าเมนู/หยุดเกม/จบเกมแทน
+    จะได้ไม่มีเฟรมกระตุกเพราะ GC ตอนกำลังพิมพ์"""
+    SAFETY_LIMIT = 200_000   # ถ้า object ใหม่สะสมเกินนี้ระหว่างเล่น ยอมเก็บรุ่นเล็กสุด (gen 0) กันหน่วยความจำบวม
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.playing = False
+        self.collections_in_play = 0
+        gc.callbacks.append(self._on_gc)
+
+    def freeze_startup(self):
+        # object ที่สร้างตอนเปิดเกม (ฟอนต์, layer, คำศัพท์) อยู่ตลอด ย้ายออกจากการสแกนของ GC ไปเลย
+        gc.collect()
+        gc.freeze()
+
+    def set_playing(self, playing):
+        if playing != self.playing:
+            self.playing = playing
+            if playing:
+                gc.disable()
+            else:
+                gc.enable()
+                gc.collect()
+        elif playing and gc.get_count()[0] > self.SAFETY_LIMIT:
+            gc.collect(0)
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            if self.playing:
+                self.collections_in_play += 1
+            self.profiler.note_gc()
+
+    def close(self):
+        gc.callbacks.remove(self._on_gc)
+        gc.enable()
+
+# ==========================================
+# 6. Game Loop และระบบ State
+# ==========================================
+def main(fps_limit=FPS_LIMIT, max_catch_up=game_logic.MAX_CATCH_UP_STEPS, dirty_rects=False, profile_startup=False,
+         record_dir=None, replay_file=None, profile_out=None, bot=None, words_file='words.txt',
+         stats_file=STATS_FILE):
+    # --- เปิดเกมแบบทีละขั้น ---
+    startup.mark("import")
+    init_display()
+    startup.mark("display")
+    load_fonts()
+    startup.mark("fonts")
+    # โหลดคำศัพท์ใน background (ไม่ต้องรอ หน้าต่างเกมขึ้นได้ทันที)
+    word_loader = WordLoader(words_file).start()
+    startup.mark("words (background)")
+
+    game_state = "MENU"
+    drawn_state = None
+    dirty = DirtyRectTracker(enabled=dirty_rects)
+    game = None   # GameState ของรอบที่กำลังเล่น (ตรรกะทั้งหมดอยู่ใน game_logic.py)
+    timestep = FixedTimestep(max_steps=max_catch_up)
+    # ถ้าสั่ง --profile-out จะเริ่มเก็บข้อมูลทันที ไม่อย่างนั้นกด F3 เพื่อเปิด/ปิด
+    profiler = FrameProfiler(enabled=profile_out is not None)
+    profiler_overlay = ProfilerOverlay()
+    gc_policy = GCPolicy(profiler)
+    gc_frozen_words = False
+
+    recorder = None   # บันทึกการพิมพ์ของรอบนี้ (--record)
+    session_replay = None   # ไฟล์ที่กำลังเล่นซ้ำ (--replay)
+    # สถิติเก็บเฉพาะตอนคนพิมพ์เอง (ไม่นับบอทและการเล่นซ้ำ) เขียนลงดิสก์ใน thread ของ StatsStore
+    stats = stats_store.StatsStore(resource_path(stats_file)) if stats_file else None
+    stats_session = None
+
+    def new_game(mode):
+        nonlocal recorder, stats_session
+        timestep.reset()
+        if mode == "PRACTICE":
+            # คำของโหมดฝึกคำนวณไว้แล้วใน writer thread ของ stats (ยังไม่มีสถิติพอก็ใช้คำศัพท์ทั้งหมด)
+            practice = stats.practice if stats is not None else None
+            words = practice if practice is not None else WORD_LIST
+            state = GameState(PRACTICE_SETTINGS, words, enemy_class=Enemy)
+        else:
+            state = GameState(DIFFICULTY_SETTINGS[mode], WORD_LIST, enemy_class=Enemy)
+        if record_dir and mode == "PRACTICE":
+            # คำของโหมดฝึกมาจากสถิติ ณ ตอนนั้น replay สร้าง word list ชุดเดิมขึ้นมาใหม่ไม่ได้
+            print("[System] โหมดฝึกไม่บันทึกการเล่น (--record)")
+        elif record_dir:
+            recorder = replay.Recorder(state)
+        if stats is not None and bot is None:
+            stats_session = stats.begin(mode)
+            state.key_listener = stats_session.key
+        return state
+
+    def save_stats():
+        nonlocal stats_session
+        stats.submit(stats_session, game)
+        stats_session = None
+
+    def rebuild_history():
+        # writer บันทึกรอบใหม่ระหว่างเปิดหน้านี้อยู่ -> layer ถูกสร้างใหม่ทั้งจอ (--dirty-rects ต้องส่งทั้งจอด้วย)
+        dirty.invalidate()
+        return build_history_layer(stats)
+
+    def save_recording():
+        nonlocal recorder
+        os.makedirs(record_dir, exist_ok=True)
+        path = os.path.join(record_dir, time.strftime("session-%Y%m%d-%H%M%S.tmdr"))
+        recorder.save(path)
+        print(f"[System] บันทึกการเล่นไว้ที่ {path}")
+        recorder = None
+
+    if replay_file:
+        # เล่นซ้ำต้องใช้ word list ชุดเดียวกับตอนบันทึก จึงรอให้โหลดเสร็จก่อน
+        word_loader.thread.join()
+        session_replay = replay.Replay.load(replay_file)
+        game = session_replay.new_state(WORD_LIST, enemy_class=Enemy)
+        game_state = "PLAYING"
 
     # พิกัดปุ่ม
     btn_width, btn_height = 400, 60
@@ -175,65 +693,100 @@ def main():
     easy_btn_rect = pygame.Rect(btn_x, HEIGHT // 2 - 20, btn_width, btn_height)
     med_btn_rect = pygame.Rect(btn_x, HEIGHT // 2 + 60, btn_width, btn_height)
     hard_btn_rect = pygame.Rect(btn_x, HEIGHT // 2 + 140, btn_width, btn_height)
+    practice_btn_rect = pygame.Rect(btn_x, HEIGHT // 2 + 220, btn_width, btn_height)
     help_btn_rect = pygame.Rect(WIDTH - 180, HEIGHT - 70, 160, 45)
+    history_btn_rect = pygame.Rect(20, 20, 160, 45)   # มุมล่างซ้ายเป็นข้อความโหลดคำศัพท์
     tut_back_btn_rect = pygame.Rect(WIDTH // 2 - 100, HEIGHT - 100, 200, 50)
     pause_button_rect = pygame.Rect(20, HEIGHT - 70, 160, 45)
     resume_btn_rect = pygame.Rect(WIDTH // 2 - 150, HEIGHT // 2 - 10, 300, 50)
     quit_btn_rect = pygame.Rect(WIDTH // 2 - 150, HEIGHT // 2 + 60, 300, 50)
 
+    layers = LayerCache()
+    menu_buttons = [
+        Button(easy_btn_rect, BTN_EASY, HOVER_EASY, "[1] EASY - 5 Mins", ui_font, WHITE),
+        Button(med_btn_rect, BTN_MED, HOVER_MED, "[2] NORMAL - 3 Mins", ui_font, WHITE),
+        Button(hard_btn_rect, BTN_HARD, HOVER_HARD, "[3] HARD - 2 Mins", ui_font, WHITE),
+        Button(help_btn_rect, BTN_HELP, HOVER_HELP, "? วิธีเล่น", ui_font, BLACK),
+    ]
+    if stats is not None:
+        menu_buttons += [
+            Button(practice_btn_rect, BTN_PAUSE, HOVER_PAUSE, "[4] PRACTICE - ตัวที่พลาดบ่อย", ui_font, BLACK),
+            Button(history_btn_rect, BTN_GRAY, HOVER_GRAY, "สถิติ (H)", ui_font, BLACK),
+        ]
+    tut_back_btn = Button(tut_back_btn_rect, BTN_GRAY, HOVER_GRAY, "< กลับ (Back)", font, BLACK)
+    pause_btn = Button(pause_button_rect, BTN_PAUSE, HOVER_PAUSE, "|| หยุด (Pause)", ui_font, BLACK, border_radius=8, text_offset=(10, 8))
+    resume_btn = Button(resume_btn_rect, BTN_EASY, HOVER_EASY, "เล่นต่อ (Resume)", font, WHITE)
+    quit_btn = Button(quit_btn_rect, BTN_HARD, HOVER_HARD, "ออกไปหน้าหลัก", font, WHITE)
+    startup.mark("buttons")
+    first_frame = True
+
+    # ปุ่มของแต่ละหน้าจอนิ่ง ใช้เช็คว่าเมาส์ขยับแล้วต้องวาดใหม่ไหม (hover เปลี่ยน)
+    state_buttons = {
+        "MENU": menu_buttons,
+        "HOW_TO_PLAY": [tut_back_btn],
+        "HISTORY": [tut_back_btn],
+        "PAUSED": [resume_btn, quit_btn],
+    }
+    drawn_key = None
+    was_playing = False
+
     running = True
     while running:
+        profiler.begin_frame()
         # --------------------------------------
         # A. จัดการ Input และ Event
         # --------------------------------------
-        for event in pygame.event.get():
+        # ตอนเล่นวนตาม FPS ปกติ ส่วนหน้าจอนิ่งให้รอ event (ไม่กิน CPU ตอนเปิดเมนูทิ้งไว้)
+        idle = game_state != "PLAYING" and not profiler.enabled
+        if idle:
+            events = [pygame.event.wait(IDLE_TIMEOUT_MS)] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
 
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE):
+                # หน้าต่างถูกบังหรือย่อแล้วกลับมา เนื้อหาบนจอหายไปแล้ว ต้องวาดใหม่ทั้งจอถึงจะไม่มีอะไรเปลี่ยนก็ตาม
+                drawn_key = None
+                dirty.invalidate()
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     if game_state == "MENU":
                         clicked_mode = None
                         if easy_btn_rect.collidepoint(event.pos):
-                            difficulty_settings = {"min_speed": 0.2, "max_speed": 0.5, "start_delay": 150, "max_enemies": 5, "time_limit": 300}
-                            clicked_mode = True
+                            clicked_mode = "EASY"
                         elif med_btn_rect.collidepoint(event.pos):
-                            difficulty_settings = {"min_speed": 0.6, "max_speed": 1.2, "start_delay": 100, "max_enemies": 8, "time_limit": 180}
-                            clicked_mode = True
+                            clicked_mode = "NORMAL"
                         elif hard_btn_rect.collidepoint(event.pos):
-                            difficulty_settings = {"min_speed": 1.0, "max_speed": 2.0, "start_delay": 60, "max_enemies": 12, "time_limit": 120}
-                            clicked_mode = True
+                            clicked_mode = "HARD"
                         elif help_btn_rect.collidepoint(event.pos):
                             game_state = "HOW_TO_PLAY"
+                        elif stats is not None and practice_btn_rect.collidepoint(event.pos):
+                            clicked_mode = "PRACTICE"
+                        elif stats is not None and history_btn_rect.collidepoint(event.pos):
+                            game_state = "HISTORY"
 
                         if clicked_mode:
                             game_state = "PLAYING"
-                            enemies.clear()
-                            active_enemy = None
-                            score = 0
-                            player_hp = 3
-                            combo = 0
-                            max_combo = 0
-                            total_keystrokes = 0
-                            correct_keystrokes = 0
-                            spawn_timer = 0
-                            spawn_delay = difficulty_settings["start_delay"]
-                            start_ticks = pygame.time.get_ticks()
+                            game = new_game(clicked_mode)
 
                     elif game_state == "PLAYING":
                         if pause_button_rect.collidepoint(event.pos):
                             game_state = "PAUSED"
-                            pause_start_ticks = pygame.time.get_ticks()
 
                     elif game_state == "PAUSED":
                         if resume_btn_rect.collidepoint(event.pos):
                             game_state = "PLAYING"
-                            pause_duration = pygame.time.get_ticks() - pause_start_ticks
-                            start_ticks += pause_duration 
                         elif quit_btn_rect.collidepoint(event.pos):
                             game_state = "MENU"
                             
-                    elif game_state == "HOW_TO_PLAY":
+                    elif game_state in ("HOW_TO_PLAY", "HISTORY"):
                         if tut_back_btn_rect.collidepoint(event.pos):
                             game_state = "MENU"
 
@@ -243,75 +796,33 @@ def main():
                 if game_state == "MENU":
                     clicked_mode = None
                     if char_pressed == '1': 
-                        difficulty_settings = {"min_speed": 0.2, "max_speed": 0.5, "start_delay": 150, "max_enemies": 5, "time_limit": 300}
-                        clicked_mode = True
+                        clicked_mode = "EASY"
                     elif char_pressed == '2': 
-                        difficulty_settings = {"min_speed": 0.6, "max_speed": 1.2, "start_delay": 100, "max_enemies": 8, "time_limit": 180}
-                        clicked_mode = True
+                        clicked_mode = "NORMAL"
                     elif char_pressed == '3': 
-                        difficulty_settings = {"min_speed": 1.0, "max_speed": 2.0, "start_delay": 60, "max_enemies": 12, "time_limit": 120}
-                        clicked_mode = True
+                        clicked_mode = "HARD"
+                    elif stats is not None and char_pressed == '4':
+                        clicked_mode = "PRACTICE"
+                    elif stats is not None and char_pressed == 'h':
+                        game_state = "HISTORY"
                         
                     if clicked_mode:
                         game_state = "PLAYING"
-                        enemies.clear()
-                        active_enemy = None
-                        score = 0
-                        player_hp = 3
-                        combo = 0
-                        max_combo = 0
-                        total_keystrokes = 0
-                        correct_keystrokes = 0
-                        spawn_timer = 0
-                        spawn_delay = difficulty_settings["start_delay"]
-                        start_ticks = pygame.time.get_ticks()
+                        game = new_game(clicked_mode)
 
                 elif game_state == "PLAYING":
                     if event.key == pygame.K_ESCAPE:
                         game_state = "PAUSED"
-                        pause_start_ticks = pygame.time.get_ticks()
-                        continue
-                    
-                    if not char_pressed.isalpha():
                         continue
-                        
-                    total_keystrokes += 1 
-
-                    if active_enemy is not None:
-                        expected_char = active_enemy.word[active_enemy.typed_index]
-                        if char_pressed == expected_char:
-                            correct_keystrokes += 1
-                            combo += 1
-                            if combo > max_combo: max_combo = combo
-                                
-                            active_enemy.typed_index += 1
-                            if active_enemy.typed_index == len(active_enemy.word):
-                                multiplier = 1 + (combo // 10)
-                                score += (10 * multiplier)
-                                enemies.remove(active_enemy)
-                                active_enemy = None
-                        else:
-                            combo = 0
-                    else:
-                        found_target = False
-                        for enemy in enemies:
-                            if enemy.word.startswith(char_pressed):
-                                active_enemy = enemy
-                                active_enemy.typed_index += 1
-                                correct_keystrokes += 1
-                                combo += 1
-                                if combo > max_combo: max_combo = combo
-                                found_target = True
-                                break
-                        
-                        if not found_target:
-                            combo = 0
+
+                    if session_replay is None:
+                        game.type_char(char_pressed)
+                        if recorder is not None and word_index.is_typeable(char_pressed):
+                            recorder.record(char_pressed)
                 
                 elif game_state == "PAUSED":
                     if event.key == pygame.K_ESCAPE or char_pressed == 'r':
                         game_state = "PLAYING"
-                        pause_duration = pygame.time.get_ticks() - pause_start_ticks
-                        start_ticks += pause_duration 
                     elif char_pressed == 'q':
                         game_state = "MENU"
 
@@ -319,201 +830,176 @@ def main():
                     if char_pressed == 'r': 
                         game_state = "MENU"
                         
-                elif game_state == "HOW_TO_PLAY":
+                elif game_state in ("HOW_TO_PLAY", "HISTORY"):
                     if event.key == pygame.K_ESCAPE:
                         game_state = "MENU"
 
+        profiler.mark(0)
+
         # --------------------------------------
         # B. อัปเดตข้อมูล (เฉพาะตอนเล่น)
         # --------------------------------------
+        # ตอน Pause จะไม่เรียก step() เวลาในเกมจึงหยุดไปด้วย
+        frame_dt = clock.get_time() / 1000
+        if game_state == "PLAYING" and not was_playing:
+            # เพิ่งกลับมาเล่น เวลาที่ค้างอยู่หน้าจออื่นไม่นับเป็นเวลาในเกม
+            # หน้าจอนิ่งข้าม clock.tick() ไป จึงต้องตั้งจุดเริ่มนับใหม่ ไม่อย่างนั้นเฟรมถัดไปจะได้เวลาที่ค้างทั้งหมด
+            clock.tick()
+            frame_dt = 0.0
+        was_playing = game_state == "PLAYING"
         if game_state == "PLAYING":
-            seconds_passed = (pygame.time.get_ticks() - start_ticks) // 1000
-            time_left = difficulty_settings["time_limit"] - seconds_passed
-            
-            if time_left <= 0:
-                time_left = 0
-                actual_time_played = difficulty_settings["time_limit"] 
-                game_state = "GAME_OVER" 
-                
-            minutes = time_left // 60
-            seconds = time_left % 60
-            time_str = f"{minutes:02d}:{seconds:02d}"
-
-            spawn_timer += 1
-            if spawn_timer >= spawn_delay:
-                if len(enemies) < difficulty_settings["max_enemies"]:
-                    new_word = random.choice(WORD_LIST)
-                    random_x = random.randint(50, WIDTH - 150)
-                    min_s = difficulty_settings["min_speed"]
-                    max_s = difficulty_settings["max_speed"]
-                    random_speed = random.uniform(min_s, max_s)
-                    random_image = random.choice(monster_images)
-                    enemies.append(Enemy(new_word, random_x, random_speed, random_image))
-                    spawn_timer = 0
-                    spawn_delay = max(50, spawn_delay - 0.5) 
+            for _ in range(timestep.advance(frame_dt)):
+                if session_replay is not None:
+                    # ส่งตัวอักษรจากไฟล์ผ่านทางเดียวกับคีย์บอร์ด (GameState.type_char)
+                    game.step(game_logic.TICK, session_replay.chars_for(game))
+                    if game.ticks >= session_replay.result[4] or game.game_over:
+                        for char_pressed in session_replay.chars_for(game):
+                            game.type_char(char_pressed)
+                        replay.report(session_replay, game)
+                        session_replay = None
+                        game_state = "GAME_OVER" if game.game_over else "MENU"
+                        break
                 else:
-                    spawn_timer = spawn_delay
-
-            for enemy in enemies[:]:
-                enemy.update()
-                if enemy.y > HEIGHT:
-                    if enemy == active_enemy:
-                        active_enemy = None
-                    enemies.remove(enemy)
-                    
-                    player_hp -= 1
-                    combo = 0 
-                    
-                    if player_hp <= 0:
-                        actual_time_played = seconds_passed
-                        game_state = "GAME_OVER"
+                    if bot is not None:
+                        # บอทพิมพ์แทนผู้เล่น ส่งผ่านทางเดียวกับ KEYDOWN (และบันทึกลง --record ได้ด้วย)
+                        for char_pressed in bot(game):
+                            game.type_char(char_pressed)
+                            if recorder is not None:
+                                recorder.record(char_pressed)
+                    game.step(game_logic.TICK)
+                if game.game_over:
+                    game_state = "GAME_OVER"
+                    break
+
+        gc_policy.set_playing(game_state == "PLAYING")
+        if not gc_frozen_words and word_loader.done and game_state != "PLAYING":
+            gc_policy.freeze_startup()
+            gc_frozen_words = True
+            if stats is not None:
+                stats.watch_practice(WORD_LIST, PRACTICE_SETTINGS["word_length"])
+
+        if recorder is not None and game_state not in ("PLAYING", "PAUSED"):
+            # รอบนี้จบแล้ว (ตายหรือกดออกไปหน้าเมนู) บันทึกลงไฟล์
+            save_recording()
+        if stats_session is not None and game_state not in ("PLAYING", "PAUSED"):
+            save_stats()
+
+        profiler.mark(1)
 
         # --------------------------------------
         # C. วาดหน้าจอ
         # --------------------------------------
-        screen.fill(BLACK)
         mouse_pos = pygame.mouse.get_pos()
+        if idle:
+            hovered = tuple(button.rect.collidepoint(mouse_pos) for button in state_buttons.get(game_state, ()))
+            loading = int(word_loader.progress * 100) if game_state == "MENU" and not word_loader.done else None
+            # stats.version เปลี่ยนเมื่อ writer บันทึกรอบล่าสุดเสร็จ (หน้าประวัติต้องวาดใหม่)
+            screen_key = (game_state, hovered, loading, stats.version if stats is not None else None)
+            if screen_key == drawn_key:
+                continue   # ไม่มีอะไรเปลี่ยนบนจอ ไม่ต้องวาดใหม่
+            drawn_key = screen_key
+        else:
+            drawn_key = None
+
+        if game_state != drawn_state:
+            # เปลี่ยนหน้าจอทั้งหน้า ต้องอัปเดตเต็มจอ 1 ครั้ง
+            dirty.invalidate()
+            drawn_state = game_state
 
         if game_state == "MENU":
-            title_text = title_font.render("TYPING MONSTER DEFENSE", True, WHITE)
-            subtitle_text = ui_font.render("Select Difficulty to Start", True, YELLOW_TARGET)
-            screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//4 - 40))
-            screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, HEIGHT//4 + 30))
-
-            buttons = [
-                (easy_btn_rect, BTN_EASY, HOVER_EASY, "[1] EASY - 5 Mins", WHITE),
-                (med_btn_rect, BTN_MED, HOVER_MED, "[2] NORMAL - 3 Mins", WHITE),
-                (hard_btn_rect, BTN_HARD, HOVER_HARD, "[3] HARD - 2 Mins", WHITE),
-                (help_btn_rect, BTN_HELP, HOVER_HELP, "? วิธีเล่น", BLACK)
-            ]
-
-            for rect, color, hover_color, text, text_color in buttons:
-                if rect.collidepoint(mouse_pos):
-                    pygame.draw.rect(screen, hover_color, rect, border_radius=10)
-                else:
-                    pygame.draw.rect(screen, color, rect, border_radius=10)
-                
-                btn_text = ui_font.render(text, True, text_color)
-                screen.blit(btn_text, (rect.centerx - btn_text.get_width()//2, rect.centery - btn_text.get_height()//2))
+            screen.blit(layers.get("menu", None, build_menu_layer), (0, 0))
+            if not word_loader.done:
+                loading_text = text_cache.render(f"กำลังโหลดคำศัพท์... {int(word_loader.progress * 100)}%", GRAY_BOX, ui_font)
+                dirty.mark("loading", screen.blit(loading_text, (20, HEIGHT - 40)), loading_text)
+            for button in menu_buttons:
+                dirty.mark(button, button.rect, button.draw(screen, mouse_pos))
 
         elif game_state == "HOW_TO_PLAY":
-            help_title = title_font.render("วิธีเล่น (HOW TO PLAY)", True, YELLOW_TARGET)
-            screen.blit(help_title, (WIDTH//2 - help_title.get_width()//2, 80))
-
-            instructions = [
-                "1. พิมพ์ตัวอักษรให้ตรงกับคำบนตัวมอนสเตอร์เพื่อทำลายพวกมัน",
-                "2. ตัวอักษรแรกที่คุณพิมพ์ จะเป็นการ 'ล็อกเป้าหมาย' (ขึ้นกรอบสีเหลือง)",
-                "3. การพิมพ์ถูกต่อเนื่องจะเพิ่ม COMBO ทำให้ได้คะแนนคูณ 2, คูณ 3!",
-                "4. ถ้ามอนสเตอร์หลุดจอ 1 ตัว จะเสียหัวใจ 1 ดวง (มีทั้งหมด 3 ดวง)",
-                "5. พยายามทำความแม่นยำและเอาตัวรอดให้ได้นานที่สุด!"
-            ]
-            
-            for i, text in enumerate(instructions):
-                inst_text = inst_font.render(text, True, WHITE)
-                screen.blit(inst_text, (80, 200 + (i * 65)))
-
-            if tut_back_btn_rect.collidepoint(mouse_pos):
-                pygame.draw.rect(screen, HOVER_GRAY, tut_back_btn_rect, border_radius=10)
-            else:
-                pygame.draw.rect(screen, BTN_GRAY, tut_back_btn_rect, border_radius=10)
-            
-            back_text = font.render("< กลับ (Back)", True, BLACK)
-            screen.blit(back_text, (tut_back_btn_rect.centerx - back_text.get_width()//2, tut_back_btn_rect.centery - back_text.get_height()//2))
-
-        elif game_state == "PLAYING" or game_state == "PAUSED":
-            
-            # --- แก้ไข Z-Index ตรงนี้ ---
-            # 1. วาดมอนสเตอร์ที่ยังไม่โดนล็อกเป้าไว้เป็นฉากหลังก่อน
-            for enemy in enemies:
-                if enemy != active_enemy:
-                    enemy.draw(screen, False)
-            
-            # 2. วาดมอนสเตอร์เป้าหมายหลักทีหลัง เพื่อให้อยู่ข้างหน้าสุดเสมอ
-            if active_enemy is not None:
-                active_enemy.draw(screen, True)
-            # ---------------------------
-
-            score_text = ui_font.render(f"Score: {score}", True, WHITE)
-            screen.blit(score_text, (20, 20))
-            
-            if combo > 1:
-                multiplier = 1 + (combo // 10)
-                combo_str = f"Combo: {combo} (x{multiplier})"
-                combo_text = font.render(combo_str, True, ORANGE)
-                screen.blit(combo_text, (20, 50))
-
-            time_color = RED if time_left <= 30 else GREEN_TYPED 
-            timer_text = ui_font.render(f"Time: {time_str}", True, time_color)
-            screen.blit(timer_text, (WIDTH - 150, 20))
-            
-            hp_text = ui_font.render(f"HP: {'♥ ' * player_hp}", True, RED)
-            screen.blit(hp_text, (WIDTH - 150, 50))
-
-            if game_state == "PLAYING":
-                if pause_button_rect.collidepoint(mouse_pos):
-                    pygame.draw.rect(screen, HOVER_PAUSE, pause_button_rect, border_radius=8)
-                else:
-                    pygame.draw.rect(screen, BTN_PAUSE, pause_button_rect, border_radius=8)
-                
-                btn_text = ui_font.render("|| หยุด (Pause)", True, BLACK)
-                screen.blit(btn_text, (pause_button_rect.x + 10, pause_button_rect.y + 8))
+            screen.blit(layers.get("help", None, build_help_layer), (0, 0))
+            dirty.mark(tut_back_btn, tut_back_btn.rect, tut_back_btn.draw(screen, mouse_pos))
 
-            if game_state == "PAUSED":
-                overlay = pygame.Surface((WIDTH, HEIGHT))
-                overlay.set_alpha(180) 
-                overlay.fill((0, 0, 0))
-                screen.blit(overlay, (0, 0))
+        elif game_state == "HISTORY":
+            screen.blit(layers.get("history", stats.version, rebuild_history), (0, 0))
+            dirty.mark(tut_back_btn, tut_back_btn.rect, tut_back_btn.draw(screen, mouse_pos))
 
-                pause_title = title_font.render("หยุดเกมชั่วคราว", True, YELLOW_TARGET)
-                screen.blit(pause_title, (WIDTH//2 - pause_title.get_width()//2, HEIGHT//3 - 30))
+        elif game_state == "PLAYING":
+            screen.fill(BLACK)
+            draw_playfield(screen, game, timestep.alpha, dirty)
+            dirty.mark(pause_btn, pause_btn.rect, pause_btn.draw(screen, mouse_pos))
 
-                if resume_btn_rect.collidepoint(mouse_pos):
-                    pygame.draw.rect(screen, HOVER_EASY, resume_btn_rect, border_radius=10)
-                else:
-                    pygame.draw.rect(screen, BTN_EASY, resume_btn_rect, border_radius=10)
-                res_text = font.render("เล่นต่อ (Resume)", True, WHITE)
-                screen.blit(res_text, (resume_btn_rect.centerx - res_text.get_width()//2, resume_btn_rect.centery - res_text.get_height()//2))
-
-                if quit_btn_rect.collidepoint(mouse_pos):
-                    pygame.draw.rect(screen, HOVER_HARD, quit_btn_rect, border_radius=10)
-                else:
-                    pygame.draw.rect(screen, BTN_HARD, quit_btn_rect, border_radius=10)
-                quit_text = font.render("ออกไปหน้าหลัก", True, WHITE)
-                screen.blit(quit_text, (quit_btn_rect.centerx - quit_text.get_width()//2, quit_btn_rect.centery - quit_text.get_height()//2))
+        elif game_state == "PAUSED":
+            # key = (game, ticks) ฉากเกมเปลี่ยนเฉพาะเมื่อมีการเล่นต่อแล้วกด Pause ใหม่
+            pause_layer = layers.get("paused", (game, game.ticks), lambda: build_pause_layer(game, timestep.alpha))
+            screen.blit(pause_layer, (0, 0))
+            dirty.mark(resume_btn, resume_btn.rect, resume_btn.draw(screen, mouse_pos))
+            dirty.mark(quit_btn, quit_btn.rect, quit_btn.draw(screen, mouse_pos))
 
         elif game_state == "GAME_OVER":
-            accuracy = 0
-            if total_keystrokes > 0:
-                accuracy = (correct_keystrokes / total_keystrokes) * 100
-                
-            played_minutes = actual_time_played / 60.0
-            wpm = 0
-            if played_minutes > 0:
-                wpm = (correct_keystrokes / 5) / played_minutes
-
-            go_title = title_font.render("GAME OVER!" if player_hp <= 0 else "TIME'S UP!", True, RED if player_hp <= 0 else YELLOW_TARGET)
-            go_score = title_font.render(f"Final Score: {score}", True, WHITE)
-            
-            stat_combo = font.render(f"Max Combo: {max_combo}", True, ORANGE)
-            stat_acc = font.render(f"Accuracy: {accuracy:.1f}%", True, GREEN_TYPED)
-            stat_wpm = font.render(f"Typing Speed: {int(wpm)} WPM", True, BLUE_MENU)
-            
-            restart_text = ui_font.render("Press 'R' to return to Menu", True, GRAY_BOX)
-            
-            screen.blit(go_title, (WIDTH//2 - go_title.get_width()//2, 100))
-            screen.blit(go_score, (WIDTH//2 - go_score.get_width()//2, 180))
-            
-            screen.blit(stat_combo, (WIDTH//2 - stat_combo.get_width()//2, 280))
-            screen.blit(stat_acc, (WIDTH//2 - stat_acc.get_width()//2, 330))
-            screen.blit(stat_wpm, (WIDTH//2 - stat_wpm.get_width()//2, 380))
-            
-            screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT - 100))
-
-        pygame.display.flip()
-        clock.tick(60)
-
+            # สรุปผล render ครั้งเดียวตอนจบเกม
+            screen.blit(layers.get("game_over", game, lambda: build_game_over_layer(game)), (0, 0))
+
+        if profiler.enabled:
+            enemy_count = len(game.enemies) if game is not None else 0
+            overlay_rect = profiler_overlay.draw(screen, profiler, [
+                f"text cache  hit {text_cache.hits}  miss {text_cache.misses}  evict {text_cache.evictions}",
+                f"enemies {enemy_count}  pixels/frame {dirty.pixels_updated}",
+                f"gc  in play {gc_policy.collections_in_play}  frames with gc {profiler.gc_frames()}/{profiler.count}",
+            ])
+            dirty.mark("profiler", overlay_rect, profiler_overlay.surface)
+
+        profiler.mark(2)
+        dirty.present()
+        profiler.mark(3)
+        if first_frame:
+            first_frame = False
+            startup.mark("first frame")
+            if profile_startup:
+                startup.report()
+        clock.tick(fps_limit)
+        profiler.mark(4)
+        profiler.end_frame(len(game.enemies) if game is not None else 0)
+
+    if recorder is not None:
+        save_recording()
+    if stats is not None:
+        if stats_session is not None:
+            save_stats()
+        stats.close()   # รอ writer เขียนรอบสุดท้ายให้เสร็จ
+    gc_policy.close()
+    if profile_out and profiler.count:
+        profiler.export(profile_out)
+        print(f"[System] บันทึกข้อมูล frame time {profiler.count} เฟรมไว้ที่ {profile_out}")
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Typing Monster Defense")
+    parser.add_argument("--fps", type=int, default=FPS_LIMIT, help="จำกัด FPS ของการวาด (0 = ไม่จำกัด)")
+    parser.add_argument("--max-catch-up", type=int, default=game_logic.MAX_CATCH_UP_STEPS,
+                        help="จำนวน tick สูงสุดที่ไล่ตามได้ใน 1 เฟรม")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="อัปเดตจอเฉพาะส่วนที่เปลี่ยน แทนการ flip ทั้งจอทุกเฟรม")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="แสดงเวลาที่ใช้ในแต่ละขั้นตอนตอนเปิดเกมจนถึงเฟรมแรก")
+    parser.add_argument("--record", metavar="DIR",
+                        help="บันทึกการพิมพ์ของทุกรอบเป็นไฟล์ .tmdr ไว้ในโฟลเดอร์นี้")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="เล่นซ้ำไฟล์ .tmdr แบบเวลาจริงพร้อมหน้าจอ (แบบไม่มีหน้าจอใช้ python replay.py FILE)")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="เก็บ frame time ตั้งแต่เปิดเกม แล้วบันทึกเป็น .csv หรือ .json ตอนปิด (กด F3 ดูระหว่างเล่น)")
+    parser.add_argument("--words", default="words.txt", metavar="FILE",
+                        help="ไฟล์คำศัพท์ (เช่น words_th.txt สำหรับภาษาไทย)")
+    parser.add_argument("--bot", type=float, metavar="WPM",
+                        help="ให้บอทพิมพ์แทนด้วยความเร็วนี้ (ดู bench.py สำหรับวัดประสิทธิภาพ)")
+    parser.add_argument("--bot-error-rate", type=float, default=0.05)
+    parser.add_argument("--bot-strategy", choices=game_logic.BOT_STRATEGIES, default="lowest")
+    parser.add_argument("--stats", default=STATS_FILE, metavar="FILE",
+                        help="ไฟล์ SQLite เก็บสถิติการพิมพ์ข้ามรอบ (ใส่ '' เพื่อไม่เก็บ)")
+    args = parser.parse_args()
+    bot = None
+    if args.bot:
+        bot = game_logic.BotTypist(args.bot, args.bot_error_rate, args.bot_strategy)
+    main(fps_limit=args.fps, max_catch_up=args.max_catch_up, dirty_rects=args.dirty_rects,
+         profile_startup=args.profile_startup, record_dir=args.record, replay_file=args.replay,
+         profile_out=args.profile_out, bot=bot, words_file=args.words,
+         stats_file=args.stats)
\ No newline at end of file
@@ -0,0 +1,211 @@
+import json
+import struct
+from array import array
+
+import game_logic
+from game_logic import HEIGHT, EnemyStore
+
+# ==========================================
+# Protocol (ข้อความระหว่าง server.py กับ client.py)
+# ==========================================
+# ทุกข้อความเป็น frame: ชนิด (1 byte) + ความยาว (u32) + payload (little-endian)
+#
+#   client -> server : HELLO (JSON {"mode"}), KEYS (seq u32 + ตัวอักษร utf-8), BYE
+#   server -> client : WELCOME (JSON), DIFF (binary), END (JSON สรุปผล), ERROR (ข้อความ utf-8)
+#
+# DIFF ส่งเฉพาะสิ่งที่เปลี่ยนตั้งแต่ DIFF ก่อนหน้า:
+#   header  : tick, input_seq ล่าสุดที่ประมวลผลแล้ว, score, hp, combo, time_left, flags, uid ของเป้าที่ล็อกอยู่
+#   spawned : ศัตรูที่เพิ่งเกิด (uid, x, y, speed, image_id, typed_index, คำ)
+#   removed : uid ที่ตายหรือหลุดจอ
+#   typed   : (uid, typed_index) ของตัวที่พิมพ์คืบหน้า
+# ศัตรูตกด้วยความเร็วคงที่ client จึงขยับเองได้ ไม่ต้องส่งตำแหน่งทุก tick
+
+HELLO, KEYS, BYE = 1, 2, 3
+WELCOME, DIFF, END, ERROR = 10, 11, 12, 13
+
+FRAME = struct.Struct("<BI")
+MAX_FRAME = 1 << 22
+MAX_CLIENT_FRAME = 1024   # client ส่งแค่ตัวอักษรที่พิมพ์ ข้อความใหญ่กว่านี้ถือว่าผิดปกติ
+
+SEQ = struct.Struct("<I")
+DIFF_HEADER = struct.Struct("<IIIiIHBI")
+COUNT = struct.Struct("<H")
+SPAWN = struct.Struct("<IhffBBB")
+TYPED = struct.Struct("<IB")
+NO_TARGET = 0xFFFFFFFF
+FLAG_GAME_OVER = 1
+
+def pack(kind, payload=b""):
+    return FRAME.pack(kind, len(payload)) + payload
+
+def pack_json(kind, obj):
+    return pack(kind, json.dumps(obj).encode('utf-8'))
+
+async def read_frame(reader, max_size=MAX_FRAME):
+    kind, length = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if length > max_size:
+        raise ValueError(f"frame ใหญ่เกินไป ({length} bytes)")
+    payload = await reader.readexactly(length) if length else b""
+    return kind, payload
+
+def read_frame_blocking(sock_file, max_size=MAX_FRAME):
+    # สำหรับ client ที่ใช้ socket ธรรมดาใน thread (คืน None เมื่อ server ปิดการเชื่อมต่อ)
+    head = sock_file.read(FRAME.size)
+    if len(head) < FRAME.size:
+        return None
+    kind, length = FRAME.unpack(head)
+    if length > max_size:
+        raise ValueError(f"frame ใหญ่เกินไป ({length} bytes)")
+    payload = sock_file.read(length) if length else b""
+    if len(payload) < length:
+        return None
+    return kind, payload
+
+def pack_keys(seq, chars):
+    return pack(KEYS, SEQ.pack(seq) + chars.encode('utf-8'))
+
+def unpack_keys(payload):
+    # payload มาจาก client โดยตรง ผิดรูปแบบให้เป็น ValueError (server ตัดการเชื่อมต่อ session นั้น)
+    if len(payload) < SEQ.size:
+        raise ValueError(f"KEYS สั้นเกินไป ({len(payload)} bytes)")
+    (seq,) = SEQ.unpack_from(payload, 0)
+    return seq, payload[SEQ.size:].decode('utf-8')
+
+# --- ฝั่ง server: หาว่าอะไรเปลี่ยนไปตั้งแต่ DIFF ก่อนหน้า ---
+class DiffEncoder:
+    """จำสิ่งที่ client รู้แล้ว (uid -> typed_index และ header ล่าสุด) ต่อ 1 session"""
+    def __init__(self):
+        self.known = {}
+        self.last_header = None
+
+    def encode(self, state, input_seq):
+        """คืน payload ของ DIFF หรือ None ถ้าไม่มีอะไรเปลี่ยน"""
+        current = {}
+        spawned = []
+        typed = []
+        known = self.known
+        for enemy in state.enemies:
+            uid = enemy.uid
+            current[uid] = enemy.typed_index
+            old = known.get(uid)
+            if old is None:
+                spawned.append(enemy)
+            elif old != enemy.typed_index:
+                typed.append((uid, enemy.typed_index))
+        removed = [uid for uid in known if uid not in current]
+        self.known = current
+
+        active = state.active_enemy.uid if state.active_enemy is not None else NO_TARGET
+        header = (input_seq, state.score, state.player_hp, state.combo, state.time_left,
+                  FLAG_GAME_OVER if state.game_over else 0, active)
+        if not spawned and not removed and not typed and header == self.last_header:
+            return None
+        self.last_header = header
+
+        out = bytearray(DIFF_HEADER.pack(state.ticks, *header))
+        out += COUNT.pack(len(spawned))
+        for enemy in spawned:
+            word = enemy.word.encode('utf-8')
+            out += SPAWN.pack(enemy.uid, int(enemy.x), enemy.y, enemy.speed, enemy.image_id, enemy.typed_index, len(word))
+            out += word
+        out += COUNT.pack(len(removed))
+        out += struct.pack(f"<{len(removed)}I", *removed)
+        out += COUNT.pack(len(typed))
+        for uid, typed_index in typed:
+            out += TYPED.pack(uid, typed_index)
+        return bytes(out)
+
+# --- ฝั่ง client: สำเนาสถานะเกมจาก DIFF ---
+class RemoteState:
+    """สำเนาของ GameState ฝั่ง client มี attribute ชุดเดียวกับที่ draw_playfield / BotTypist ใช้
+    enemy_class = main.Enemy ถ้าจะวาด หรือ game_logic.Enemy ถ้าไม่มีหน้าจอ"""
+    def __init__(self, enemy_class=game_logic.Enemy):
+        self.enemy_class = enemy_class
+        self.enemies = EnemyStore()
+        self.by_uid = {}
+        self.active_enemy = None
+        self.ticks = 0
+        self.input_seq = 0
+        self.score = 0
+        self.player_hp = game_logic.START_HP
+        self.combo = 0
+        self.max_combo = 0
+        self.time_left = 0
+        self.game_over = False
+        self.result = {}   # สรุปผลจาก END
+
+    def advance(self, dt):
+        # ขยับตามความเร็วระหว่างรอ DIFF ถัดไป ตัวที่หลุดจอจะรอให้ server สั่งลบเอง
+        self.enemies.update(dt, HEIGHT * 10)
+
+    def apply(self, payload):
+        (self.ticks, self.input_seq, self.score, self.player_hp, self.combo, self.time_left,
+         flags, active) = DIFF_HEADER.unpack_from(payload, 0)
+        self.game_over = bool(flags & FLAG_GAME_OVER)
+        self.max_combo = max(self.max_combo, self.combo)
+        pos = DIFF_HEADER.size
+
+        (count,) = COUNT.unpack_from(payload, pos)
+        pos += COUNT.size
+        for _ in range(count):
+            uid, x, y, speed, image_id, typed_index, length = SPAWN.unpack_from(payload, pos)
+            pos += SPAWN.size
+            enemy = self.enemy_class(payload[pos:pos + length].decode('utf-8'), image_id)
+            pos += length
+            enemy.typed_index = typed_index
+            self.enemies.add(enemy, x, speed, y)
+            self.by_uid[uid] = enemy
+
+        (count,) = COUNT.unpack_from(payload, pos)
+        pos += COUNT.size
+        for uid in struct.unpack_from(f"<{count}I", payload, pos):
+            enemy = self.by_uid.pop(uid, None)
+            if enemy is not None:
+                self.enemies.remove(enemy)
+        pos += 4 * count
+
+        (count,) = COUNT.unpack_from(payload, pos)
+        pos += COUNT.size
+        for _ in range(count):
+            uid, typed_index = TYPED.unpack_from(payload, pos)
+            pos += TYPED.size
+            enemy = self.by_uid.get(uid)
+            if enemy is not None:
+                enemy.typed_index = typed_index
+
+        self.active_enemy = self.by_uid.get(active)
+
+    def finish(self, result):
+        self.result = result
+        self.score = result["score"]
+        self.max_combo = result["max_combo"]
+        self.game_over = True
+
+    def accuracy(self):
+        return self.result.get("accuracy", 0)
+
+    def wpm(self):
+        return self.result.get("wpm", 0)
+
+# --- สถิติ latency (ring buffer เหมือน FrameProfiler) ---
+class LatencyStats:
+    def __init__(self, capacity=8192):
+        self.capacity = capacity
+        self.samples = array('d', [0.0]) * capacity
+        self.pos = 0
+        self.count = 0
+
+    def add(self, ms):
+        self.samples[self.pos] = ms
+        self.pos = (self.pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def percentiles(self, points=(50, 95, 99, 100)):
+        if not self.count:
+            return {p: 0.0 for p in points}
+        samples = sorted(self.samples[:self.count])
+        return {p: samples[min(len(samples) - 1, len(samples) * p // 100)] for p in points}
+
+    def summary(self):
+        values = self.percentiles()
+        return "  ".join(f"p{p} {ms:.2f} ms" for p, ms in values.items())
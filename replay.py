@@ -0,0 +1,163 @@
+import sys
+import json
+import time
+import struct
+import hashlib
+import argparse
+
+import game_logic
+
+# ==========================================
+# Replay (บันทึกและเล่นซ้ำการพิมพ์)
+# ==========================================
+# เกมเป็น deterministic (seed + คำศัพท์ + ตัวอักษรที่พิมพ์ในแต่ละ tick) จึงบันทึกแค่ input ก็พอ
+#
+# รูปแบบไฟล์ .tmdr (little-endian):
+#   header   : magic, version, seed, sha1 ของ word list, ความยาว JSON ของ difficulty_settings + JSON
+#   result   : score, max_combo, total_keystrokes, correct_keystrokes, ticks (ไว้ตรวจตอนเล่นซ้ำ)
+#   keys     : จำนวน + (tick ที่ห่างจากตัวก่อนหน้าแบบ varint, ความยาว, ตัวอักษร utf-8) ต่อ 1 ครั้งที่กด
+
+MAGIC = b"TMDR"
+VERSION = 3   # 2: เกิดศัตรู/นับเวลาด้วย Scheduler, 3: สุ่มคำด้วย WordSampler (ไฟล์เวอร์ชันเก่าเล่นซ้ำให้ตรงไม่ได้)
+HEADER = struct.Struct("<4sBQ20sH")
+RESULT = struct.Struct("<IIIII")
+COUNT = struct.Struct("<I")
+
+def words_digest(words):
+    sha1 = hashlib.sha1()
+    for word in words:
+        sha1.update(word.encode('utf-8'))
+        sha1.update(b"\n")
+    return sha1.digest()
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class Recorder:
+    """จดทุกตัวอักษรที่ส่งเข้า GameState.type_char พร้อม tick ที่กด"""
+    def __init__(self, state):
+        self.state = state
+        self.keys = []
+
+    def record(self, char_pressed):
+        self.keys.append((self.state.ticks, char_pressed))
+
+    def save(self, path):
+        state = self.state
+        settings_json = json.dumps(state.settings, sort_keys=True).encode('utf-8')
+        out = bytearray(HEADER.pack(MAGIC, VERSION, state.seed, words_digest(state.words), len(settings_json)))
+        out += settings_json
+        out += RESULT.pack(state.score, state.max_combo, state.total_keystrokes, state.correct_keystrokes, state.ticks)
+        out += COUNT.pack(len(self.keys))
+        last_tick = 0
+        for tick, char_pressed in self.keys:
+            write_varint(out, tick - last_tick)
+            data = char_pressed.encode('utf-8')
+            out.append(len(data))
+            out += data
+            last_tick = tick
+        with open(path, 'wb') as file:
+            file.write(out)
+
+class Replay:
+    def __init__(self, seed, settings, digest, result, keys):
+        self.seed = seed
+        self.settings = settings
+        self.digest = digest
+        self.result = result   # (score, max_combo, total_keystrokes, correct_keystrokes, ticks)
+        self.keys = keys
+        self.pos = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, seed, digest, settings_len = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} ไม่ใช่ไฟล์ replay เวอร์ชันนี้")
+        pos = HEADER.size
+        settings = json.loads(data[pos:pos + settings_len].decode('utf-8'))
+        pos += settings_len
+        result = RESULT.unpack_from(data, pos)
+        pos += RESULT.size
+        (count,) = COUNT.unpack_from(data, pos)
+        pos += COUNT.size
+
+        keys = []
+        tick = 0
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            tick += delta
+            length = data[pos]
+            keys.append((tick, data[pos + 1:pos + 1 + length].decode('utf-8')))
+            pos += 1 + length
+        return cls(seed, settings, digest, result, keys)
+
+    def new_state(self, words, enemy_class=game_logic.Enemy):
+        if words_digest(words) != self.digest:
+            print("[Warning] word list ไม่ตรงกับตอนบันทึก ผลการเล่นซ้ำอาจไม่ตรง")
+        self.pos = 0
+        return game_logic.GameState(self.settings, words, self.seed, enemy_class=enemy_class)
+
+    def chars_for(self, state):
+        # ตัวอักษรที่ต้องส่งก่อน step ถัดไป (เรียกทุก tick ตามลำดับ)
+        chars = []
+        while self.pos < len(self.keys) and self.keys[self.pos][0] <= state.ticks:
+            chars.append(self.keys[self.pos][1])
+            self.pos += 1
+        return chars
+
+    def verify(self, state):
+        """คืน list ของค่าที่ไม่ตรงกับตอนบันทึก (ว่าง = ตรงทุกอย่าง)"""
+        names = ("score", "max_combo", "total_keystrokes", "correct_keystrokes", "ticks")
+        actual = (state.score, state.max_combo, state.total_keystrokes, state.correct_keystrokes, state.ticks)
+        return [(name, want, got) for name, want, got in zip(names, self.result, actual) if want != got]
+
+def run_headless(replay, words):
+    state = replay.new_state(words)
+    target_ticks = replay.result[4]
+    while not state.game_over and state.ticks < target_ticks:
+        state.step(game_logic.TICK, replay.chars_for(state))
+    # ตัวอักษรที่กดหลัง tick สุดท้าย (เช่นพิมพ์แล้วกดออกทันที)
+    for char_pressed in replay.chars_for(state):
+        state.type_char(char_pressed)
+    return state
+
+def report(replay, state):
+    mismatches = replay.verify(state)
+    print(f"[Replay] score={state.score} max_combo={state.max_combo} accuracy={state.accuracy():.1f}% ticks={state.ticks}")
+    if mismatches:
+        for name, want, got in mismatches:
+            print(f"[Replay] ไม่ตรง! {name}: บันทึกไว้ {want} ได้ {got}")
+    else:
+        print("[Replay] ผลตรงกับที่บันทึกไว้ทุกค่า")
+    return not mismatches
+
+if __name__ == "__main__":
+    import word_index
+
+    parser = argparse.ArgumentParser(description="เล่นซ้ำไฟล์ .tmdr แบบไม่มีหน้าจอ เร็วเท่าที่ CPU ทำได้")
+    parser.add_argument("replay_file")
+    parser.add_argument("--words", default="words.txt")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.replay_file)
+    words = word_index.load_or_build(args.words)
+    start = time.perf_counter()
+    state = run_headless(replay, words)
+    elapsed = time.perf_counter() - start
+    print(f"[Replay] {state.ticks} ticks ใน {elapsed * 1000:.1f} ms ({state.ticks / max(elapsed, 1e-9):,.0f} ticks/s)")
+    sys.exit(0 if report(replay, state) else 1)
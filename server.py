@@ -0,0 +1,336 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import asyncio
+import argparse
+import itertools
+import threading
+import multiprocessing
+
+import game_logic
+import word_index
+import word_sampler
+import protocol
+from game_logic import DIFFICULTY_SETTINGS, TICK, GameState
+
+# ==========================================
+# Game Server (หลาย session พร้อมกันในเครื่องเดียว)
+# ==========================================
+# process หลักรับการเชื่อมต่อด้วย asyncio (TCP หรือ Unix socket) ส่วนตัวเกมรันใน worker process
+# แต่ละ session อยู่ใน worker เดียวตลอด (เลือกตัวที่มี session น้อยที่สุด) จึงใช้ได้ทุก core
+#
+#   process หลัก --(open/keys/close)--> worker : ผ่าน Pipe
+#   worker --(DIFF ที่ encode แล้วของทุก session ต่อรอบ)--> process หลัก --> socket ของ client
+#
+#   python server.py --port 7777 --workers 4
+#   python client.py --port 7777               (เล่นผ่าน server)
+#   python client.py --port 7777 --bots 300    (ทดสอบโหลด)
+
+DEFAULT_PORT = 7777
+MAX_PENDING_KEYS = 64          # ตัวอักษรที่รอ tick ถัดไปได้สูงสุดต่อ session (เกินนี้ทิ้ง)
+MAX_WRITE_BUFFER = 256 * 1024  # client ที่อ่านไม่ทันจนค้างเกินนี้จะถูกตัดการเชื่อมต่อ
+
+class NetEnemy(game_logic.Enemy):
+    # uid ใหม่ทุกครั้งที่ดึงจาก pool (object ถูกใช้ซ้ำ จึงใช้ id() แยกศัตรูแต่ละตัวไม่ได้)
+    __slots__ = ("uid",)
+    ids = itertools.count()
+
+    def reset(self, word, image_id, units=None):
+        super().reset(word, image_id, units)
+        self.uid = next(NetEnemy.ids) & 0xFFFFFFFF
+
+class Session:
+    def __init__(self, sid, mode, seed, words):
+        self.sid = sid
+        self.state = GameState(DIFFICULTY_SETTINGS[mode], words, seed, enemy_class=NetEnemy)
+        self.pending = []
+        self.input_seq = 0
+        self.encoder = protocol.DiffEncoder()
+
+    def feed(self, seq, chars):
+        room = MAX_PENDING_KEYS - len(self.pending)
+        self.pending.extend(chars[:max(room, 0)])
+        self.input_seq = seq
+
+    def step(self):
+        self.state.step(TICK, self.pending)
+        self.pending.clear()
+
+    def result(self):
+        state = self.state
+        return {"score": state.score, "max_combo": state.max_combo, "accuracy": state.accuracy(),
+                "wpm": state.wpm(), "ticks": state.ticks}
+
+# ==========================================
+# 1. Worker process
+# ==========================================
+def worker_main(inbox, outbox, words_path, send_every):
+    try:
+        words = word_index.load_or_build(words_path)
+    except FileNotFoundError:
+        words = ["python", "project", "coding", "game", "keyboard"]
+    word_sampler.prepare(words, DIFFICULTY_SETTINGS.values())
+    sessions = {}
+    tick = 0
+    deadline = time.perf_counter()
+
+    def fail_session(sid, error):
+        sessions.pop(sid, None)
+        outbox.send(("failed", sid, f"{type(error).__name__}: {error}"))
+
+    def handle(message):
+        kind = message[0]
+        try:
+            if kind == "keys":
+                session = sessions.get(message[1])
+                if session is not None:
+                    session.feed(message[2], message[3])
+            elif kind == "open":
+                sid, mode, seed = message[1:]
+                sessions[sid] = Session(sid, mode, seed, words)
+            elif kind == "close":
+                sessions.pop(message[1], None)
+        except Exception as error:
+            # ข้อความเสียของ session เดียวต้องไม่ทำให้ worker (และทุก session ในนั้น) ตาย
+            fail_session(message[1], error)
+
+    while True:
+        # รับคำสั่งที่ค้างอยู่ทุกรอบก่อน step ถึง tick ก่อนหน้าจะช้าจนเลย deadline ไปแล้วก็ตาม
+        # (ถ้ารับเฉพาะตอนมีเวลาเหลือ worker ที่ช้าจะไม่อ่าน Pipe อีกเลย)
+        while inbox.poll():
+            message = inbox.recv()
+            if message[0] == "stop":
+                return
+            handle(message)
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            inbox.poll(remaining)   # รอจนถึงเวลา tick หรือมีคำสั่งใหม่เข้ามา
+            continue
+
+        now = time.perf_counter()
+        if now - deadline > game_logic.MAX_CATCH_UP_STEPS * TICK:
+            deadline = now   # ตามไม่ทันจริงๆ ทิ้งเวลาส่วนเกินเหมือนฝั่งเกม (FixedTimestep)
+        tick += 1
+        for sid, session in list(sessions.items()):
+            try:
+                session.step()
+            except Exception as error:
+                fail_session(sid, error)
+
+        if tick % send_every == 0:
+            diffs = []
+            ended = []
+            for sid, session in list(sessions.items()):
+                try:
+                    payload = session.encoder.encode(session.state, session.input_seq)
+                except Exception as error:
+                    fail_session(sid, error)   # เช่นคำยาวเกินกว่าที่ SPAWN เก็บได้
+                    continue
+                if payload is not None:
+                    diffs.append((sid, payload))
+                if session.state.game_over:
+                    ended.append((sid, session.result()))
+            for sid, result in ended:
+                del sessions[sid]
+            outbox.send(("diffs", deadline, time.perf_counter(), diffs, ended))
+        deadline += TICK
+
+class WorkerHandle:
+    def __init__(self, words_path, send_every):
+        # Pipe ทางเดียว 2 เส้น: send_conn (process หลัก -> worker), recv_conn (worker -> process หลัก)
+        worker_inbox, self.send_conn = multiprocessing.Pipe(duplex=False)
+        self.recv_conn, worker_outbox = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(target=worker_main, args=(worker_inbox, worker_outbox, words_path, send_every),
+                                               daemon=True)
+        self.sessions = 0
+        # เขียน Pipe จาก thread แยก: send() ของ Pipe block ได้เมื่อ buffer เต็ม ถ้าเรียกจาก event loop ตรงๆ
+        # worker ที่ช้าตัวเดียวจะทำให้ทุก client บน server ค้างไปด้วย
+        self.outbox = queue.SimpleQueue()
+
+    def start(self):
+        self.process.start()
+        threading.Thread(target=self._send_loop, daemon=True).start()
+        return self
+
+    def send(self, *message):
+        self.outbox.put(message)
+
+    def _send_loop(self):
+        while True:
+            message = self.outbox.get()
+            try:
+                self.send_conn.send(message)
+            except OSError:
+                return   # worker ตายไปแล้ว (_pump แจ้งเตือนไว้แล้ว) session ที่ค้างอยู่จะถูกตัดตอน client ส่งข้อมูลมา
+
+# ==========================================
+# 2. Process หลัก (asyncio)
+# ==========================================
+class GameServer:
+    def __init__(self, workers=None, words_path="words.txt", send_every=1, stats_interval=5.0):
+        if os.path.exists(words_path):
+            # compile word index ครั้งเดียวก่อนแยก process (worker ทุกตัว mmap ไฟล์เดียวกัน)
+            words = word_index.load_or_build(words_path)
+            if isinstance(words, word_index.WordIndex):
+                words.close()
+        self.workers = [WorkerHandle(words_path, send_every) for _ in range(workers or os.cpu_count() or 1)]
+        self.send_every = send_every
+        self.stats_interval = stats_interval
+        self.clients = {}   # sid -> (writer, worker)
+        self.next_sid = 1
+        self.tick_latency = protocol.LatencyStats()   # เวลาตั้งแต่กำหนด tick จนส่ง DIFF ออก socket
+        self.step_time = protocol.LatencyStats()      # เวลาตั้งแต่กำหนด tick จน worker step + encode เสร็จ
+        self.bytes_sent = 0
+        self.loop = None
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+        self.loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            worker.start()
+            threading.Thread(target=self._pump, args=(worker,), daemon=True).start()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+            where = unix_path
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"{host}:{port}"
+        print(f"[Server] รอการเชื่อมต่อที่ {where} ({len(self.workers)} worker, ส่ง DIFF ทุก {self.send_every} tick)")
+        async with server:
+            stats_task = asyncio.create_task(self.print_stats())
+            try:
+                await server.serve_forever()
+            finally:
+                stats_task.cancel()
+
+    def stop(self):
+        for worker in self.workers:
+            if worker.process.is_alive():
+                worker.send("stop")
+                worker.process.join(timeout=1)
+
+    def _pump(self, worker):
+        # thread ละ 1 worker: รอข้อความจาก Pipe แล้วส่งต่อเข้า event loop
+        while True:
+            try:
+                message = worker.recv_conn.recv()
+            except (EOFError, OSError):
+                print("[Warning] worker หยุดทำงาน", file=sys.stderr)
+                return
+            self.loop.call_soon_threadsafe(self.dispatch, worker, message)
+
+    def dispatch(self, worker, message):
+        if message[0] == "failed":
+            _, sid, reason = message
+            print(f"[Warning] session {sid} ผิดพลาดใน worker: {reason}", file=sys.stderr)
+            self._write(sid, protocol.pack(protocol.ERROR, reason.encode('utf-8')))
+            self.drop(sid)
+            return
+        _, deadline, stepped_at, diffs, ended = message
+        for sid, payload in diffs:
+            self._write(sid, protocol.pack(protocol.DIFF, payload))
+        for sid, result in ended:
+            self._write(sid, protocol.pack_json(protocol.END, result))
+            self.drop(sid)
+        now = time.perf_counter()
+        self.step_time.add((stepped_at - deadline) * 1000)
+        self.tick_latency.add((now - deadline) * 1000)
+
+    def _write(self, sid, frame):
+        client = self.clients.get(sid)
+        if client is None:
+            return
+        writer = client[0]
+        if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            print(f"[Warning] session {sid} อ่านข้อมูลไม่ทัน ตัดการเชื่อมต่อ", file=sys.stderr)
+            self.drop(sid)
+            return
+        writer.write(frame)
+        self.bytes_sent += len(frame)
+
+    def drop(self, sid):
+        client = self.clients.pop(sid, None)
+        if client is None:
+            return
+        writer, worker = client
+        worker.send("close", sid)
+        worker.sessions -= 1
+        writer.close()
+
+    async def handle(self, reader, writer):
+        sid = None
+        try:
+            kind, payload = await protocol.read_frame(reader, protocol.MAX_CLIENT_FRAME)
+            hello = json.loads(payload) if kind == protocol.HELLO else {}
+            if not isinstance(hello, dict):
+                hello = {}
+            mode = hello.get("mode")
+            seed = hello.get("seed")
+            error = None
+            if not isinstance(mode, str) or mode not in DIFFICULTY_SETTINGS:
+                error = f"ไม่รู้จักโหมด {mode!r}"
+            elif seed is not None and (type(seed) is not int or not 0 <= seed < 2 ** 64):
+                error = f"seed ต้องเป็นจำนวนเต็ม 0..2^64-1 (ได้ {seed!r})"
+            if error is not None:
+                writer.write(protocol.pack(protocol.ERROR, error.encode('utf-8')))
+                await writer.drain()
+                writer.close()
+                return
+
+            sid = self.next_sid
+            self.next_sid += 1
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            worker = min(self.workers, key=lambda handle: handle.sessions)
+            worker.sessions += 1
+            self.clients[sid] = (writer, worker)
+            worker.send("open", sid, mode, seed)
+            writer.write(protocol.pack_json(protocol.WELCOME, {"session": sid, "mode": mode, "seed": seed,
+                                                               "tick_rate": game_logic.TICK_RATE,
+                                                               "send_every": self.send_every}))
+
+            while sid in self.clients:
+                kind, payload = await protocol.read_frame(reader, protocol.MAX_CLIENT_FRAME)
+                if kind == protocol.KEYS:
+                    seq, chars = protocol.unpack_keys(payload)
+                    worker.send("keys", sid, seq, chars)
+                elif kind == protocol.BYE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            if sid is not None:
+                self.drop(sid)
+            else:
+                writer.close()
+
+    async def print_stats(self):
+        last_bytes = 0
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            rate = (self.bytes_sent - last_bytes) / self.stats_interval / 1024
+            last_bytes = self.bytes_sent
+            print(f"[Server] sessions {len(self.clients)}  ส่งออก {rate:.1f} KiB/s")
+            print(f"[Server]   tick latency  {self.tick_latency.summary()}")
+            print(f"[Server]   worker step   {self.step_time.summary()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Typing Monster Defense server (หลาย session, แยก process)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="ใช้ Unix socket แทน TCP")
+    parser.add_argument("--workers", type=int, default=None, help="จำนวน worker process (ค่าเริ่มต้น = จำนวน core)")
+    parser.add_argument("--send-every", type=int, default=1, help="ส่ง DIFF ทุกกี่ tick (1 = 60 ครั้ง/วินาที)")
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--stats-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    game_server = GameServer(args.workers, args.words, args.send_every, args.stats_interval)
+    try:
+        asyncio.run(game_server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        game_server.stop()
@@ -0,0 +1,207 @@
+import time
+import queue
+import sqlite3
+import threading
+from heapq import nlargest
+
+import word_index
+import word_sampler
+
+# ==========================================
+# Stats Store (สถิติการพิมพ์ข้ามรอบ)
+# ==========================================
+# เก็บเวลาและความถูกต้องของทุกการกดลง SQLite (WAL) ผ่าน writer thread เกมจึงไม่ต้องรอเขียนดิสก์
+# ตอนจบแต่ละรอบ writer จะบวกผลรวมเข้าตารางสรุปต่อตัวอักษร / ต่อคู่ตัวอักษร (bigram) ทันที
+# หน้าประวัติและโหมดฝึกอ่านจากตารางสรุปเท่านั้น ไม่ต้องไล่ keystrokes ใหม่ ต่อให้เล่นไปหลายพันรอบ
+# คำของโหมดฝึกก็คำนวณใน writer thread หลังบันทึกแต่ละรอบ (ไล่ทั้ง word list ใช้เวลา ไม่ควรทำตอนกดเริ่มเกม)
+#
+#   sessions     : ผลสรุปของแต่ละรอบ
+#   keystrokes   : log ทุกการกด (append-only ไว้วิเคราะห์ภายหลัง)
+#   letter_stats : ตัวอักษร -> จำนวนถูก/ผิด, ผลรวม latency
+#   bigram_stats : คู่ตัวอักษรที่พิมพ์ต่อกันในคำเดียวกัน -> เหมือน letter_stats
+
+MAX_LATENCY_MS = 2000   # ช่วงห่างเกินนี้ถือว่าหยุดพัก (เช่นกด Pause) ไม่นับเป็น latency
+MIN_SAMPLES = 10        # ตัวอักษรที่พิมพ์น้อยกว่านี้ยังไม่นับว่าอ่อน
+ERROR_PENALTY = 4.0     # weakness = latency เฉลี่ย * (1 + ERROR_PENALTY * error rate)
+PRACTICE_LETTERS = 8    # โหมดฝึกเลือกคำจากตัวอักษรที่อ่อนที่สุดกี่ตัว
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY, started REAL, mode TEXT, score INTEGER, max_combo INTEGER,
+    accuracy REAL, wpm REAL, keystrokes INTEGER, correct INTEGER, duration REAL);
+CREATE TABLE IF NOT EXISTS keystrokes (
+    session INTEGER, t REAL, expected TEXT, typed TEXT, correct INTEGER, latency_ms REAL);
+CREATE TABLE IF NOT EXISTS letter_stats (
+    letter TEXT PRIMARY KEY, hits INTEGER, errors INTEGER, latency_sum REAL, latency_count INTEGER);
+CREATE TABLE IF NOT EXISTS bigram_stats (
+    bigram TEXT PRIMARY KEY, hits INTEGER, errors INTEGER, latency_sum REAL, latency_count INTEGER);
+"""
+
+UPSERT = """INSERT INTO {table} VALUES (?, ?, ?, ?, ?) ON CONFLICT({key}) DO UPDATE SET
+    hits = hits + excluded.hits, errors = errors + excluded.errors,
+    latency_sum = latency_sum + excluded.latency_sum, latency_count = latency_count + excluded.latency_count"""
+
+WEAKNESS = f"""(latency_sum / latency_count) * (1 + {ERROR_PENALTY} * errors * 1.0 / (hits + errors))"""
+
+def query_history(conn, limit=10):
+    return conn.execute("SELECT started, mode, score, accuracy, wpm FROM sessions ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+def query_weakest(conn, table="letter_stats", key="letter", limit=5):
+    """คืน (ตัวอักษร, latency เฉลี่ย ms, error rate, weakness) เรียงจากอ่อนที่สุด"""
+    return conn.execute(f"SELECT {key}, latency_sum / latency_count, errors * 1.0 / (hits + errors), {WEAKNESS} "
+                        f"FROM {table} WHERE latency_count > 0 AND hits + errors >= ? ORDER BY 4 DESC LIMIT ?",
+                        (MIN_SAMPLES, limit)).fetchall()
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")   # WAL + NORMAL: ไม่ fsync ทุก commit แต่ไฟล์ไม่เสียถ้าเกมปิดกะทันหัน
+    conn.executescript(SCHEMA)
+    return conn
+
+class StatsSession:
+    """จดการกดของ 1 รอบไว้ในหน่วยความจำ (GameState.key_listener) แล้วส่งให้ writer ตอนจบรอบ"""
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.last = None
+        self.prev = None   # ตัวอักษรก่อนหน้าที่พิมพ์ถูกในคำเดียวกัน (สำหรับ bigram)
+        self.keys = []     # (t, expected, typed, correct, latency_ms, bigram)
+        self.result = None
+
+    def key(self, expected, typed, correct, new_word):
+        now = time.perf_counter()
+        latency = None
+        if self.last is not None and (now - self.last) * 1000 <= MAX_LATENCY_MS:
+            latency = (now - self.last) * 1000
+        self.last = now
+        if new_word:
+            self.prev = None
+        bigram = self.prev + expected if self.prev is not None and expected is not None else None
+        self.keys.append((now - self.start, expected, typed, correct, latency, bigram))
+        self.prev = expected if correct else None
+
+    def finish(self, game):
+        self.result = (game.score, game.max_combo, game.accuracy(), game.wpm(),
+                       game.total_keystrokes, game.correct_keystrokes, time.perf_counter() - self.start)
+
+def aggregate(rows):
+    # rows = (key, correct, latency_ms) -> {key: [hits, errors, latency_sum, latency_count]}
+    totals = {}
+    for key, correct, latency in rows:
+        if key is None:
+            continue
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = [0, 0, 0.0, 0]
+        if correct:
+            entry[0] += 1
+            if latency is not None:
+                entry[2] += latency
+                entry[3] += 1
+        else:
+            entry[1] += 1
+    return [(key, *entry) for key, entry in totals.items()]
+
+class StatsStore:
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.version = 0   # เพิ่มทุกครั้งที่ writer บันทึกเสร็จ (ใช้เป็น key ของ layer หน้าประวัติ)
+        self.practice = None          # WordList ของโหมดฝึก (None = ยังไม่มีสถิติพอ)
+        self.practice_source = None   # (words, word_length) ที่ตั้งผ่าน watch_practice (ใช้ใน writer thread เท่านั้น)
+        self.reader = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # --- ฝั่งเกม (main thread) ---
+    def begin(self, mode):
+        return StatsSession(mode)
+
+    def submit(self, session, game):
+        if session.keys:
+            session.finish(game)
+            self.queue.put(session)
+
+    def watch_practice(self, words, word_length):
+        # เรียกครั้งเดียวหลังโหลดคำศัพท์เสร็จ writer จะคำนวณ self.practice ใหม่ทุกครั้งที่บันทึกรอบใหม่
+        self.queue.put(("practice", words, word_length))
+
+    def close(self):
+        # รอ writer เขียนที่ค้างอยู่ให้เสร็จก่อนปิดเกม
+        self.queue.put(None)
+        self.thread.join()
+        if self.reader is not None:
+            self.reader.close()
+
+    # --- writer thread ---
+    def _run(self):
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as error:
+            print(f"[Warning] เปิดไฟล์สถิติ {self.path} ไม่ได้ ({error}) รอบนี้จะไม่บันทึกสถิติ")
+            return
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            try:
+                if isinstance(item, tuple):
+                    self.practice_source = item[1:]
+                else:
+                    with conn:
+                        self._write(conn, item)
+                    self.version += 1
+                if self.practice_source is not None:
+                    self._update_practice(conn)
+            except sqlite3.Error as error:
+                print(f"[Warning] บันทึกสถิติไม่สำเร็จ: {error}")
+        conn.close()
+
+    def _update_practice(self, conn):
+        words, word_length = self.practice_source
+        practice = practice_words(words, query_weakest(conn, limit=PRACTICE_LETTERS), word_length)
+        self.practice = word_index.WordList(practice) if practice else None
+
+    def _write(self, conn, session):
+        score, max_combo, accuracy, wpm, keystrokes, correct, duration = session.result
+        cursor = conn.execute("INSERT INTO sessions (started, mode, score, max_combo, accuracy, wpm, keystrokes, correct, duration) "
+                              "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              (session.started, session.mode, score, max_combo, accuracy, wpm, keystrokes, correct, duration))
+        session_id = cursor.lastrowid
+        conn.executemany("INSERT INTO keystrokes VALUES (?, ?, ?, ?, ?, ?)",
+                         [(session_id, t, expected, typed, int(ok), latency)
+                          for t, expected, typed, ok, latency, bigram in session.keys])
+        conn.executemany(UPSERT.format(table="letter_stats", key="letter"),
+                         aggregate((expected, ok, latency) for t, expected, typed, ok, latency, bigram in session.keys))
+        conn.executemany(UPSERT.format(table="bigram_stats", key="bigram"),
+                         aggregate((bigram, ok, latency) for t, expected, typed, ok, latency, bigram in session.keys))
+
+    # --- อ่าน (main thread, อ่านได้พร้อมกับ writer เพราะใช้ WAL) ---
+    def _read(self, query, *args):
+        try:
+            if self.reader is None:
+                self.reader = connect(self.path)
+            return query(self.reader, *args)
+        except sqlite3.Error:
+            return []   # ไฟล์เปิดไม่ได้ (writer แจ้งเตือนไปแล้ว) ถือว่ายังไม่มีสถิติ
+
+    def history(self, limit=10):
+        return self._read(query_history, limit)
+
+    def weakest(self, table="letter_stats", key="letter", limit=5):
+        return self._read(query_weakest, table, key, limit)
+
+def practice_words(words, weak_letters, word_length=(1, 99), count=300):
+    """เลือกคำที่มีตัวอักษรอ่อนเยอะที่สุด (weak_letters = ผลจาก query_weakest)
+    กรองความยาวก่อน ไม่อย่างนั้นคำสั้น 1-2 ตัวจะได้คะแนนเฉลี่ยสูงสุดเสมอ"""
+    weights = {letter: weakness for letter, latency, error_rate, weakness in weak_letters}
+    if not weights:
+        return None
+    min_length, max_length = word_length
+    def score(word):
+        return sum(weights.get(char, 0.0) for char in word) / len(word)
+    candidates = (words[index] for first_char, length, rank, index in word_sampler.word_entries(words)
+                  if min_length <= length <= max_length)
+    return [word for word in nlargest(count, candidates, key=score) if score(word) > 0]
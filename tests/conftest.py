@@ -0,0 +1,17 @@
+import os
+import sys
+
+# โมดูลของเกมอยู่ที่ root ของ repo (ไม่ได้เป็น package) ให้ import ได้ไม่ว่าจะรัน pytest จากโฟลเดอร์ไหน
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import word_index
+
+# คำศัพท์ชุดเล็กที่ใช้ร่วมกันทุกไฟล์ (ตัวอักษรแรกไม่ซ้ำกัน ศัตรูบนจอจึงไม่แย่งเป้ากัน)
+WORDS = ["apple", "banana", "cherry", "delta", "eagle", "falcon", "grape", "hotel", "igloo", "jungle",
+         "kite", "lemon", "mango", "night", "olive", "piano", "queen", "river", "sugar", "tiger"]
+THAI_WORDS = ["กิน", "น้ำ", "ข้าว", "ไก่", "ปลา", "ดี", "ทำ", "ห้อง"]
+
+def word_list(words=WORDS):
+    return word_index.WordList(words)
@@ -0,0 +1,86 @@
+import pytest
+
+import game_logic
+from game_logic import DIFFICULTY_SETTINGS, TICK, BotTypist, FixedTimestep, GameState, simulate
+from conftest import THAI_WORDS, word_list
+
+def summary(state):
+    return (state.score, state.max_combo, state.total_keystrokes, state.correct_keystrokes,
+            state.ticks, state.player_hp, state.time_left)
+
+def play(mode, seed, bot_seed=1, max_ticks=3000):
+    words = word_list()
+    bot = BotTypist(wpm=90, error_rate=0.1, seed=bot_seed)
+    return simulate(DIFFICULTY_SETTINGS[mode], words, seed, bot, max_ticks=max_ticks)
+
+@pytest.mark.parametrize("mode", list(DIFFICULTY_SETTINGS))
+def test_same_seed_same_game(mode):
+    first = play(mode, seed=7)
+    second = play(mode, seed=7)
+    assert summary(first) == summary(second)
+    assert first.total_keystrokes > 0
+
+def test_seed_changes_spawned_words():
+    words = word_list()
+    spawned = []
+    for seed in (1, 2):
+        state = simulate(DIFFICULTY_SETTINGS["HARD"], words, seed, max_ticks=600)
+        spawned.append([enemy.word for enemy in state.enemies])
+    assert spawned[0] != spawned[1]
+
+def test_numpy_and_python_paths_match(monkeypatch):
+    if game_logic.np is None:
+        pytest.skip("ไม่มี numpy")
+    with_numpy = summary(play("HARD", seed=3))
+    monkeypatch.setattr(game_logic, "np", None)
+    assert summary(play("HARD", seed=3)) == with_numpy
+
+def test_typing_a_word_destroys_enemy():
+    state = GameState(DIFFICULTY_SETTINGS["EASY"], word_list(), seed=1)
+    state.spawn_enemy()
+    enemy = next(iter(state.enemies))
+    word = enemy.word
+    for char in word:
+        state.type_char(char)
+    assert len(state.enemies) == 0
+    assert state.active_enemy is None
+    assert state.correct_keystrokes == len(word)
+    assert state.score > 0
+
+def test_wrong_key_resets_combo():
+    state = GameState(DIFFICULTY_SETTINGS["EASY"], word_list(), seed=1)
+    state.spawn_enemy()
+    enemy = next(iter(state.enemies))
+    state.type_char(enemy.word[0])
+    assert state.combo == 1
+    state.type_char("z" if enemy.word[1] != "z" else "y")
+    assert state.combo == 0
+    assert state.total_keystrokes == 2 and state.correct_keystrokes == 1
+
+def test_thai_marks_complete_a_unit():
+    state = GameState(DIFFICULTY_SETTINGS["EASY"], word_list(THAI_WORDS), seed=1)
+    state.spawn_enemy()
+    enemy = next(iter(state.enemies))
+    first_unit = enemy.units[0]
+    for char in first_unit:
+        state.type_char(char)
+    assert enemy.typed_index == 1
+    assert state.partial == ""
+    assert state.correct_keystrokes == len(first_unit)
+
+def test_time_only_advances_with_step():
+    settings = dict(DIFFICULTY_SETTINGS["EASY"], time_limit=2)
+    state = GameState(settings, word_list(), seed=1)
+    state.player_hp = 10 ** 6   # ไม่ให้จบเพราะศัตรูหลุดจอ
+    for _ in range(game_logic.TICK_RATE):
+        state.step(TICK)
+    assert state.time_left == 1 and not state.game_over
+    for _ in range(game_logic.TICK_RATE):
+        state.step(TICK)
+    assert state.game_over and state.time_left == 0
+
+def test_fixed_timestep_caps_catch_up():
+    timestep = FixedTimestep(max_steps=5)
+    assert timestep.advance(TICK * 2.5) == 2
+    assert timestep.advance(10.0) == 5   # เครื่องกระตุกนานๆ ไม่ไล่ตามเกิน max_steps
+    assert 0.0 <= timestep.alpha < 1.0
@@ -0,0 +1,58 @@
+import pytest
+
+import protocol
+from game_logic import DIFFICULTY_SETTINGS, TICK, BotTypist, GameState
+from server import NetEnemy
+from conftest import THAI_WORDS, word_list
+
+def snapshot(state):
+    enemies = sorted((enemy.word, enemy.typed_index, enemy.image_id, int(enemy.x)) for enemy in state.enemies)
+    active = state.active_enemy.word if state.active_enemy is not None else None
+    return enemies, active, state.score, state.player_hp, state.combo, state.time_left, state.game_over
+
+def run_session(words, mode="HARD", ticks=1800):
+    state = GameState(DIFFICULTY_SETTINGS[mode], words, seed=4, enemy_class=NetEnemy)
+    bot = BotTypist(wpm=100, error_rate=0.1, seed=3)
+    encoder = protocol.DiffEncoder()
+    remote = protocol.RemoteState()
+    seq = 0
+    for _ in range(ticks):
+        chars = bot(state)
+        if chars:
+            seq += 1
+        state.step(TICK, chars)
+        payload = encoder.encode(state, seq)
+        if payload is not None:
+            remote.apply(payload)
+        # client ต้องเห็นสถานะเดียวกับ server ทุก tick (ตำแหน่ง y client ขยับเอง จึงไม่เทียบ)
+        assert snapshot(remote) == snapshot(state)
+        assert remote.input_seq == seq
+        if state.game_over:
+            break
+    return state, remote, encoder
+
+def test_remote_state_follows_server():
+    state, remote, encoder = run_session(word_list())
+    assert state.ticks > 60
+
+def test_remote_state_follows_server_thai():
+    run_session(word_list(THAI_WORDS), mode="EASY", ticks=900)
+
+def test_no_diff_when_nothing_changed():
+    state = GameState(DIFFICULTY_SETTINGS["EASY"], word_list(), seed=1, enemy_class=NetEnemy)
+    encoder = protocol.DiffEncoder()
+    state.step(TICK)
+    assert encoder.encode(state, 0) is not None
+    assert encoder.encode(state, 0) is None
+
+def test_keys_round_trip():
+    frame = protocol.pack_keys(42, "abน้ำ")
+    kind, length = protocol.FRAME.unpack_from(frame, 0)
+    assert kind == protocol.KEYS and length == len(frame) - protocol.FRAME.size
+    assert protocol.unpack_keys(frame[protocol.FRAME.size:]) == (42, "abน้ำ")
+
+def test_short_keys_payload_is_value_error():
+    with pytest.raises(ValueError):
+        protocol.unpack_keys(b"\x01")
+    with pytest.raises(ValueError):
+        protocol.unpack_keys(protocol.SEQ.pack(1) + b"\xff")   # utf-8 ไม่ถูกต้อง
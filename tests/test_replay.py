@@ -0,0 +1,56 @@
+import pytest
+
+import replay
+from game_logic import DIFFICULTY_SETTINGS, TICK, BotTypist, GameState
+from conftest import THAI_WORDS, word_list
+
+def record_game(path, words, mode="NORMAL", seed=5, ticks=2400):
+    # บันทึกแบบเดียวกับ main.py: ส่งตัวอักษรเข้า type_char และ Recorder ก่อน step ของ tick นั้น
+    state = GameState(DIFFICULTY_SETTINGS[mode], words, seed)
+    recorder = replay.Recorder(state)
+    bot = BotTypist(wpm=80, error_rate=0.1, seed=2)
+    while not state.game_over and state.ticks < ticks:
+        for char_pressed in bot(state):
+            state.type_char(char_pressed)
+            recorder.record(char_pressed)
+        state.step(TICK)
+    recorder.save(path)
+    return state, recorder
+
+@pytest.mark.parametrize("words", [word_list(), word_list(THAI_WORDS)], ids=["english", "thai"])
+def test_replay_round_trip(tmp_path, words):
+    path = str(tmp_path / "session.tmdr")
+    state, recorder = record_game(path, words)
+    loaded = replay.Replay.load(path)
+    assert loaded.keys == recorder.keys
+    assert loaded.seed == state.seed
+    assert loaded.settings == DIFFICULTY_SETTINGS["NORMAL"]
+    assert loaded.digest == replay.words_digest(words)
+
+    replayed = replay.run_headless(loaded, words)
+    assert loaded.verify(replayed) == []
+
+def test_tampered_keys_are_detected(tmp_path):
+    path = str(tmp_path / "session.tmdr")
+    words = word_list()
+    record_game(path, words)
+    loaded = replay.Replay.load(path)
+    loaded.keys = loaded.keys[:len(loaded.keys) // 2]
+    assert loaded.verify(replay.run_headless(loaded, words)) != []
+
+def test_varint_round_trip():
+    values = [0, 1, 127, 128, 300, 2 ** 21, 2 ** 32 - 1]
+    out = bytearray()
+    for value in values:
+        replay.write_varint(out, value)
+    pos = 0
+    for value in values:
+        got, pos = replay.read_varint(out, pos)
+        assert got == value
+    assert pos == len(out)
+
+def test_other_version_is_rejected(tmp_path):
+    path = tmp_path / "old.tmdr"
+    path.write_bytes(replay.HEADER.pack(replay.MAGIC, replay.VERSION - 1, 0, b"\0" * 20, 0))
+    with pytest.raises(ValueError):
+        replay.Replay.load(str(path))
@@ -0,0 +1,88 @@
+import game_logic
+from game_logic import TICK, TICK_RATE, GameState, Scheduler
+from conftest import word_list
+
+# ศัตรูตกช้ามาก (ไม่หลุดจอระหว่างทดสอบ) และจังหวะเกิดคงที่ 1 วินาที ถ้า test ไม่ได้เปลี่ยนเอง
+BASE = {"min_speed": 1, "max_speed": 1, "start_delay": 1.0, "ramp": 0.0, "min_delay": 0.1,
+        "max_enemies": 50, "time_limit": 100, "unique_letters": False}
+
+def make_state(**overrides):
+    state = GameState(dict(BASE, **overrides), word_list(), seed=1)
+    spawned = []
+    spawn_enemy = state.spawn_enemy
+    def record():
+        spawned.append(state.ticks)
+        return spawn_enemy()
+    state.spawn_enemy = record   # จด tick ที่ศัตรูแต่ละตัวเกิด
+    return state, spawned
+
+def run(state, ticks):
+    for _ in range(ticks):
+        state.step(TICK)
+
+def test_scheduler_orders_by_time_then_insertion():
+    events = Scheduler()
+    events.push(2.0, "late")
+    events.push(1.0, "first")
+    events.push(1.0, "second")
+    assert list(events.due(0.5)) == []
+    assert [kind for kind, data in events.due(1.0)] == ["first", "second"]
+    assert len(events) == 1
+    assert [kind for kind, data in events.due(5.0)] == ["late"]
+
+def test_regular_spawns_follow_delay():
+    state, spawned = make_state()
+    run(state, 200)
+    assert spawned == [60, 120, 180]
+
+def test_ramp_shortens_delay_down_to_min_delay():
+    state, spawned = make_state(ramp=-0.25, min_delay=0.5)
+    run(state, 170)
+    # 1.0 -> +0.75 -> +0.5 -> +0.5 (ไม่ต่ำกว่า min_delay)
+    assert spawned == [60, 105, 135, 165]
+
+def test_wave_burst_with_gap():
+    state, spawned = make_state(start_delay=100, waves=[{"at": 2, "burst": 3, "gap": 0.5}])
+    run(state, 240)
+    assert spawned == [120, 150, 180]
+
+def test_wave_pause_postpones_regular_spawns():
+    state, spawned = make_state(waves=[{"at": 1.5, "pause": 2}])
+    run(state, 280)
+    # ตัวที่ควรเกิดตอน 2.0 ถูกเลื่อนไปตอนหมด pause (3.5) แล้วนับจังหวะต่อจากตรงนั้น
+    assert spawned == [60, 210, 270]
+
+def test_wave_speed_and_delay():
+    state, spawned = make_state(waves=[{"at": 1.5, "speed": 2, "delay": 0.25}])
+    run(state, 151)
+    # คิวถัดไป (2.0) นัดไว้แล้วก่อน wave delay ใหม่จึงเริ่มใช้หลังจากนั้น
+    assert spawned == [60, 120, 135, 150]
+    speeds = sorted(enemy.speed for enemy in state.enemies)
+    assert speeds == [1, 2, 2, 2]
+
+def test_full_screen_parks_spawns_until_an_enemy_leaves():
+    state, spawned = make_state(max_enemies=2)
+    run(state, 200)
+    assert spawned == [60, 120]
+    assert state.spawn_blocked
+    assert not any(kind == game_logic.EVENT_SPAWN for when, order, kind, data in state.events.queue)
+
+    target = max(state.enemies, key=lambda enemy: enemy.y)
+    for char in target.word:
+        state.type_char(char)
+    assert len(state.enemies) == 1 and not state.spawn_blocked
+    run(state, 1)
+    assert spawned == [60, 120, 201]   # เกิดทันทีใน tick ถัดไป ไม่ต้องรอคิวรอบใหม่
+
+def test_clock_counts_down_and_ends_game():
+    state, spawned = make_state(time_limit=3)
+    run(state, TICK_RATE - 1)
+    assert state.time_left == 3
+    run(state, 1)
+    assert state.time_left == 2
+    run(state, 2 * TICK_RATE)
+    assert state.game_over and state.time_left == 0
+    assert state.ticks == 3 * TICK_RATE
+    assert state.actual_time_played == 3
+    run(state, 10)
+    assert state.ticks == 3 * TICK_RATE   # จบแล้ว step ไม่เดินต่อ
@@ -0,0 +1,75 @@
+import time
+import struct
+import threading
+import multiprocessing
+
+import server
+
+def start_worker(tmp_path):
+    # รัน worker_main ใน thread (ใช้ Pipe จริงแบบเดียวกับ WorkerHandle) คำศัพท์ใช้ชุดสำรองเพราะไม่มีไฟล์
+    worker_inbox, send_conn = multiprocessing.Pipe(duplex=False)
+    recv_conn, worker_outbox = multiprocessing.Pipe(duplex=False)
+    thread = threading.Thread(target=server.worker_main,
+                              args=(worker_inbox, worker_outbox, str(tmp_path / "missing.txt"), 1), daemon=True)
+    thread.start()
+    return send_conn, recv_conn, thread
+
+def collect(recv_conn, seconds):
+    seen = set()
+    failed = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        if not recv_conn.poll(0.05):
+            continue
+        message = recv_conn.recv()
+        if message[0] == "failed":
+            failed.append(message[1])
+        else:
+            seen.update(sid for sid, payload in message[3])
+    return seen, failed
+
+def test_slow_worker_still_reads_inbox(tmp_path, monkeypatch):
+    step = server.Session.step
+    def slow_step(self):
+        time.sleep(0.02)   # ช้ากว่า 1 tick ทุกครั้ง
+        step(self)
+    monkeypatch.setattr(server.Session, "step", slow_step)
+
+    send_conn, recv_conn, thread = start_worker(tmp_path)
+    send_conn.send(("open", 1, "EASY", 1))
+    first, failed = collect(recv_conn, 0.3)
+    send_conn.send(("open", 2, "EASY", 2))
+    later, failed = collect(recv_conn, 0.5)
+    send_conn.send(("stop",))
+    thread.join(timeout=2)
+    assert first == {1}
+    assert 2 in later   # session ที่เปิดหลังจาก worker เริ่มช้าแล้วต้องได้ DIFF ด้วย
+    assert not thread.is_alive()
+
+def test_bad_session_does_not_kill_worker(tmp_path):
+    send_conn, recv_conn, thread = start_worker(tmp_path)
+    send_conn.send(("open", 1, "NOPE", 1))
+    send_conn.send(("open", 2, "EASY", [1]))
+    send_conn.send(("open", 3, "EASY", 3))
+    seen, failed = collect(recv_conn, 0.3)
+    send_conn.send(("stop",))
+    thread.join(timeout=2)
+    assert failed == [1, 2]
+    assert seen == {3}
+
+def test_encode_failure_only_drops_that_session(tmp_path, monkeypatch):
+    encode = server.protocol.DiffEncoder.encode
+    def broken_for_seed_1(self, state, input_seq):
+        if state.seed == 1:
+            raise struct.error("ubyte format requires 0 <= number <= 255")   # เช่นคำยาวเกิน 255 byte
+        return encode(self, state, input_seq)
+    monkeypatch.setattr(server.protocol.DiffEncoder, "encode", broken_for_seed_1)
+
+    send_conn, recv_conn, thread = start_worker(tmp_path)
+    send_conn.send(("open", 1, "EASY", 1))
+    send_conn.send(("open", 3, "EASY", 3))
+    seen, failed = collect(recv_conn, 0.3)
+    send_conn.send(("stop",))
+    thread.join(timeout=2)
+    assert failed == [1]
+    assert seen == {3}
@@ -0,0 +1,71 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import stats_store
+from conftest import word_list
+
+GAME = SimpleNamespace(score=10, max_combo=3, accuracy=lambda: 90.0, wpm=lambda: 30.0,
+                       total_keystrokes=4, correct_keystrokes=3)
+
+@pytest.fixture
+def clock(monkeypatch):
+    # เวลาเดินทีละ 125 ms ต่อการเรียก perf_counter ทุก latency ในรอบจึงเท่ากับ 125 (ลงตัวในเลขฐานสอง)
+    now = [0.0]
+    def perf_counter():
+        now[0] += 0.125
+        return now[0]
+    monkeypatch.setattr(stats_store.time, "perf_counter", perf_counter)
+
+def play(store, keys):
+    session = store.begin("EASY")
+    for expected, typed, new_word in keys:
+        session.key(expected, typed, expected == typed, new_word)
+    store.submit(session, GAME)
+
+def table(path, name):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0]: row[1:] for row in conn.execute(f"SELECT * FROM {name}")}
+    finally:
+        conn.close()
+
+def test_aggregate_counts_latency_only_for_correct_keys():
+    rows = [("a", True, 100.0), ("a", False, 300.0), ("a", True, None), ("b", True, 50.0), (None, True, 10.0)]
+    assert sorted(stats_store.aggregate(rows)) == [("a", 2, 1, 100.0, 1), ("b", 1, 0, 50.0, 1)]
+
+def test_sessions_accumulate_letter_and_bigram_stats(tmp_path, clock):
+    path = str(tmp_path / "stats.db")
+    store = stats_store.StatsStore(path)
+    play(store, [("c", "c", True), ("a", "a", False), ("t", "t", False)])
+    play(store, [("c", "c", True), ("a", "x", False), ("a", "a", False), ("t", "t", False)])
+    store.close()
+    assert store.version == 2
+
+    # latency ของปุ่มแรกในแต่ละรอบไม่นับ (ยังไม่มีปุ่มก่อนหน้า)
+    assert table(path, "letter_stats") == {"c": (2, 0, 0.0, 0), "a": (2, 1, 250.0, 2), "t": (2, 0, 250.0, 2)}
+    # พิมพ์ผิดแล้ว bigram ถัดไปเริ่มนับใหม่ ("xa" ไม่ใช่คู่ที่พิมพ์ถูกต่อกัน)
+    assert table(path, "bigram_stats") == {"ca": (1, 1, 125.0, 1), "at": (2, 0, 250.0, 2)}
+    assert len(table(path, "sessions")) == 2
+
+def test_query_weakest_orders_by_latency_and_errors(tmp_path):
+    conn = stats_store.connect(str(tmp_path / "stats.db"))
+    conn.executemany("INSERT INTO letter_stats VALUES (?, ?, ?, ?, ?)", [
+        ("a", 20, 0, 2000.0, 20),    # 100 ms ไม่ผิดเลย
+        ("b", 15, 5, 1500.0, 15),    # 100 ms ผิด 25%
+        ("c", 20, 0, 6000.0, 20),    # 300 ms
+        ("d", 5, 0, 5000.0, 5),      # ช้ามากแต่ตัวอย่างยังไม่ถึง MIN_SAMPLES
+    ])
+    weakest = stats_store.query_weakest(conn)
+    conn.close()
+    assert [row[0] for row in weakest] == ["c", "b", "a"]
+    letter, latency, error_rate, weakness = weakest[1]
+    assert (latency, error_rate) == (100.0, 0.25)
+    assert weakness == pytest.approx(100.0 * (1 + stats_store.ERROR_PENALTY * 0.25))
+
+def test_practice_words_ranks_weak_letters_within_length():
+    words = word_list(["zz", "zzzz", "zzza", "aaaa", "bbbb", "zazb"])
+    weak = [("z", 300.0, 0.0, 3.0), ("a", 100.0, 0.0, 1.0)]
+    assert stats_store.practice_words(words, weak, word_length=(4, 4)) == ["zzzz", "zzza", "zazb", "aaaa"]
+    assert stats_store.practice_words(words, []) is None
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+import word_index
+from conftest import THAI_WORDS, WORDS
+
+SOURCE = WORDS + THAI_WORDS + ["Apple", "it's", "x2", "", "  Mixed  "]
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("\n".join(SOURCE) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_clean_words_filters_and_lowercases():
+    assert list(word_index.clean_words(["Apple\n", "it's", "x2", "", "  Mixed  ", "น้ำ"])) == ["apple", "mixed", "น้ำ"]
+
+def test_segment_keeps_marks_with_base():
+    assert word_index.segment("cat") == ("c", "a", "t")
+    assert word_index.segment("น้ำ") == ("น้ำ",)
+    assert word_index.segment("ข้าว") == ("ข้", "า", "ว")
+
+def test_index_round_trip(source):
+    index_path = source + ".idx"
+    word_index.build_index(source, index_path)
+    index = word_index.WordIndex(index_path)
+    try:
+        expected = word_index.read_source(source)
+        assert len(index) == len(expected)
+        # คำถูกจัดกลุ่มใหม่ตาม (ความยาว, ตัวอักษรแรก) แต่ rank ต้องชี้กลับไปที่ลำดับเดิมในไฟล์
+        by_rank = {}
+        for first_char, start, ranks, lengths in index.group_ranks():
+            for offset, rank in enumerate(ranks):
+                word = index[start + offset]
+                assert word[0] == first_char
+                length = lengths if isinstance(lengths, int) else lengths[offset]
+                assert length == len(word_index.segment(word))
+                by_rank[rank] = word
+        assert [by_rank[rank] for rank in range(len(expected))] == expected
+        for i in range(len(index)):
+            assert index.units(i) == word_index.segment(index[i])
+        assert index.is_fresh(source)
+    finally:
+        index.close()
+
+def test_unit_bitmap_marks_unit_starts():
+    word = "ข้าว"
+    byte_len = len(word.encode("utf-8"))
+    mask = int.from_bytes(word_index.unit_bitmap(word, byte_len), "little")
+    starts = [k for k in range(byte_len) if mask >> k & 1]
+    assert starts == [0, 6, 9]   # ข้ (2 ตัว x 3 byte), า, ว
+
+def test_stale_index_is_rebuilt(source):
+    words = word_index.load_or_build(source)
+    words.close()
+    with open(source, "a", encoding="utf-8") as file:
+        file.write("zebra\n")
+    os.utime(source, ns=(1, 1))
+    words = word_index.load_or_build(source)
+    try:
+        assert "zebra" in [words[i] for i in range(len(words))]
+    finally:
+        words.close()
+
+def test_unwritable_index_falls_back_to_word_list(source, monkeypatch):
+    def read_only(*args, **kwargs):
+        raise OSError(30, "Read-only file system")
+    monkeypatch.setattr(word_index, "build_index", read_only)
+    words = word_index.load_or_build(source)
+    assert isinstance(words, word_index.WordList)
+    assert list(words) == word_index.read_source(source)
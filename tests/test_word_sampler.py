@@ -0,0 +1,90 @@
+import random
+from collections import Counter
+
+import pytest
+
+import word_index
+import word_sampler
+from game_logic import GameState
+from word_sampler import AliasTable, WordSampler
+from conftest import WORDS, word_list
+
+DRAWS = 40000
+
+def frequencies(draw, n=DRAWS):
+    counts = Counter(draw() for _ in range(n))
+    return {key: count / n for key, count in counts.items()}
+
+def test_alias_table_matches_weights():
+    weights = [1, 2, 3, 4, 0]
+    table = AliasTable(weights)
+    rng = random.Random(0)
+    freq = frequencies(lambda: table.draw(rng))
+    assert 4 not in freq   # น้ำหนัก 0 ต้องไม่ถูกสุ่มเลย
+    for i, weight in enumerate(weights[:4]):
+        assert freq[i] == pytest.approx(weight / 10, abs=0.01)
+
+def test_avoid_skips_letters_on_screen():
+    sampler = WordSampler(word_list())
+    rng = random.Random(1)
+    avoid = {word[0]: [] for word in WORDS[:10]}   # รูปแบบเดียวกับ EnemyStore.buckets
+    for _ in range(2000):
+        assert sampler.words[sampler.sample_index(rng, avoid)][0] not in avoid
+
+def test_avoid_falls_back_to_remaining_letter():
+    sampler = WordSampler(word_list())
+    rng = random.Random(2)
+    avoid = {word[0]: [] for word in WORDS[1:]}   # เหลือ "a" ตัวเดียว สุ่มซ้ำ MAX_REJECTS ครั้งแทบไม่มีทางเจอ
+    assert {sampler.words[sampler.sample_index(rng, avoid)] for _ in range(200)} == {"apple"}
+
+def test_avoid_every_letter_still_samples():
+    sampler = WordSampler(word_list())
+    rng = random.Random(3)
+    avoid = {word[0]: [] for word in WORDS}
+    assert 0 <= sampler.sample_index(rng, avoid) < len(WORDS)
+
+def test_spawned_enemies_have_unique_first_letters():
+    settings = {"min_speed": 1, "max_speed": 1, "start_delay": 1.0, "max_enemies": 20, "time_limit": 60}
+    state = GameState(settings, word_list(), seed=4)
+    for _ in range(20):
+        state.spawn_enemy()
+    letters = [enemy.word[0] for enemy in state.enemies]
+    assert len(set(letters)) == len(letters) == 20
+
+def test_word_length_prefers_range():
+    words = word_list(["ab", "abc", "abcd", "abcde", "abcdef", "bc", "bcd", "bcde", "bcdef", "bcdefg"])
+    sampler = WordSampler(words, word_length=(4, 4))
+    rng = random.Random(5)
+    in_range = sum(len(sampler.words[sampler.sample_index(rng)]) == 4 for _ in range(DRAWS)) / DRAWS
+    # 2 คำที่อยู่ในช่วง น้ำหนัก 1 เทียบกับอีก 8 คำที่น้ำหนัก OFF_LENGTH_WEIGHT
+    expected = 2 / (2 + 8 * word_sampler.OFF_LENGTH_WEIGHT)
+    assert in_range == pytest.approx(expected, abs=0.01)
+
+def test_common_bias_favours_low_ranks():
+    words = word_list(["a" * 3 + chr(ord("a") + i) for i in range(20)])   # ตัวอักษรแรกเดียวกัน ต่างกันแค่ rank
+    rng = random.Random(6)
+    flat = frequencies(lambda: WordSampler(words, common_bias=0.0).sample_index(rng), 4000)
+    biased_sampler = WordSampler(words, common_bias=1.0)
+    biased = frequencies(lambda: biased_sampler.sample_index(rng))
+    assert max(flat.values()) < 0.1
+    weights = [(rank + word_sampler.RANK_OFFSET) ** -1.0 for rank in range(20)]
+    assert biased[0] == pytest.approx(weights[0] / sum(weights), abs=0.01)
+    assert biased[0] > biased[19]
+
+def test_entries_match_between_index_and_list(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_text("\n".join(WORDS + ["กิน", "น้ำ", "ข้าว"]) + "\n", encoding="utf-8")
+    index = word_index.load_or_build(str(source))
+    try:
+        from_index = sorted((first, length, rank, index[i]) for first, length, rank, i in word_sampler.word_entries(index))
+        plain = word_index.WordList(word_index.read_source(str(source)))
+        from_list = sorted((first, length, rank, plain[i]) for first, length, rank, i in word_sampler.word_entries(plain))
+        assert from_index == from_list
+    finally:
+        index.close()
+
+def test_get_sampler_is_cached_per_profile():
+    words = word_list()
+    easy = {"word_length": [3, 5], "common_bias": 1.0}
+    assert word_sampler.get_sampler(words, easy) is word_sampler.get_sampler(words, dict(easy))
+    assert word_sampler.get_sampler(words, easy) is not word_sampler.get_sampler(words, {"word_length": [6, 12]})
@@ -0,0 +1,224 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import unicodedata
+from array import array
+from bisect import bisect_right
+
+# ==========================================
+# Word Index (ไฟล์คำศัพท์แบบ compile แล้ว)
+# ==========================================
+# แปลง words.txt เป็นไฟล์ binary ที่ mmap ได้ทันที ไม่ต้องอ่านและกรองทีละบรรทัดทุกครั้งที่เปิดเกม
+# คำจะถูกจัดกลุ่มตาม (ความยาว, ตัวอักษรแรก) ทุกคำในกลุ่มยาวเท่ากันจึงเก็บต่อกันแบบ fixed stride
+#
+# รูปแบบไฟล์ (little-endian):
+#   header : magic, version, mtime_ns, size, sha1 ของไฟล์ต้นฉบับ, จำนวนคำ, จำนวนกลุ่ม
+#   groups : (byte_len, first_char, count, words_offset, ranks_offset, units_offset) ต่อกลุ่ม
+#   data   : ตัวคำ (utf-8), ลำดับความถี่ (rank, u32) และจุดแบ่ง unit ของแต่ละคำในกลุ่ม
+#            (bitmap ละ ceil(byte_len / 8) byte: bit k = มี unit เริ่มที่ byte k, units_offset = 0 ถ้าทั้งกลุ่มเป็น ASCII)
+
+MAGIC = b"TMDW"
+VERSION = 2
+HEADER = struct.Struct("<4sHQQ20sII")
+GROUP = struct.Struct("<HIIQQQ")
+RANK = struct.Struct("<I")
+
+# --- unit ที่พิมพ์ได้ (แยกครั้งเดียวตอนโหลด ไม่ต้องแยกใหม่ทุกครั้งที่กดคีย์) ---
+# 1 unit = ตัวอักษรหลัก + สระ/วรรณยุกต์ที่ซ้อนอยู่ (เช่น "น้ำ" เป็น unit เดียว) ป้ายคำจะแบ่งสีได้เฉพาะระหว่าง unit
+# จึงไม่มีวรรณยุกต์ลอยแยกจากพยัญชนะ ส่วนการพิมพ์ยังกดทีละตัวตามแป้นพิมพ์ภาษาไทยปกติ
+SPACING_MARKS = "\u0e33\u0eb3"   # สระอำ (ไทย/ลาว) category เป็น Lo แต่ตามกฎ grapheme ต้องติดกับตัวหน้า
+
+def is_mark(char):
+    return unicodedata.category(char)[0] == "M" or char in SPACING_MARKS
+
+def is_typeable(char):
+    return len(char) == 1 and (char.isalpha() or is_mark(char))
+
+def segment(word):
+    if word.isascii():
+        return tuple(word)
+    units = []
+    for char in word:
+        if units and is_mark(char):
+            units[-1] += char
+        else:
+            units.append(char)
+    return tuple(units)
+
+def clean_words(lines):
+    for line in lines:
+        clean_word = line.strip().lower()
+        if clean_word and clean_word[0].isalpha() and all(is_typeable(char) for char in clean_word):
+            yield clean_word
+
+def unit_bitmap(word, byte_len):
+    mask = 0
+    pos = 0
+    for unit in segment(word):
+        mask |= 1 << pos
+        pos += len(unit.encode('utf-8'))
+    return mask.to_bytes((byte_len + 7) // 8, 'little')
+
+def file_digest(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            sha1.update(chunk)
+    return sha1.digest()
+
+def read_source(path, progress=None):
+    # อ่านไฟล์ต้นฉบับพร้อมรายงานความคืบหน้า (0-1) ตามจำนวน byte ที่อ่านไปแล้ว
+    total = os.path.getsize(path) or 1
+    words = []
+    done = 0
+    with open(path, 'r', encoding='utf-8') as file:
+        for i, line in enumerate(file):
+            done += len(line.encode('utf-8'))
+            words.extend(clean_words((line,)))
+            if progress and i % 4096 == 0:
+                progress(min(done / total, 1.0) * 0.9)
+    return words
+
+def build_index(src_path, index_path, progress=None):
+    words = read_source(src_path, progress)
+    stat = os.stat(src_path)
+    digest = file_digest(src_path)
+
+    groups = {}
+    for rank, word in enumerate(words):
+        data = word.encode('utf-8')
+        groups.setdefault((len(data), ord(word[0])), []).append((data, rank))
+
+    keys = sorted(groups)
+    data_start = HEADER.size + GROUP.size * len(keys)
+    table = []
+    chunks = []
+    offset = data_start
+    for byte_len, first_char in keys:
+        members = groups[(byte_len, first_char)]
+        words_offset = offset
+        chunks.append(b"".join(data for data, rank in members))
+        offset += byte_len * len(members)
+        ranks_offset = offset
+        chunks.append(b"".join(RANK.pack(rank) for data, rank in members))
+        offset += RANK.size * len(members)
+        units_offset = 0
+        if any(not data.isascii() for data, rank in members):
+            units_offset = offset
+            chunks.append(b"".join(unit_bitmap(data.decode('utf-8'), byte_len) for data, rank in members))
+            offset += (byte_len + 7) // 8 * len(members)
+        table.append(GROUP.pack(byte_len, first_char, len(members), words_offset, ranks_offset, units_offset))
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, stat.st_mtime_ns, stat.st_size, digest, len(words), len(keys)))
+        file.writelines(table)
+        file.writelines(chunks)
+    os.replace(tmp_path, index_path)   # เขียนไฟล์ใหม่ให้เสร็จก่อนค่อยแทนที่ กันไฟล์เสียถ้าเกมปิดกลางทาง
+    if progress:
+        progress(1.0)
+
+class WordIndex:
+    """เปิดไฟล์ index ด้วย mmap ใช้งานเหมือน list ของคำ (len, [i]) โดยไม่ต้องโหลดทุกคำเข้าหน่วยความจำ"""
+    def __init__(self, index_path):
+        with open(index_path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.src_mtime_ns, self.src_size, self.src_digest,
+         self.count, group_count) = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.buffer.close()
+            raise ValueError(f"{index_path} ไม่ใช่ไฟล์ word index เวอร์ชันนี้")
+
+        self.groups = [GROUP.unpack_from(self.buffer, HEADER.size + i * GROUP.size) for i in range(group_count)]
+        self.starts = []   # index เริ่มต้นของแต่ละกลุ่ม ใช้ bisect หา group จาก index รวม
+        total = 0
+        for byte_len, first_char, count, words_offset, ranks_offset, units_offset in self.groups:
+            self.starts.append(total)
+            total += count
+
+    def __len__(self):
+        return self.count
+
+    def _locate(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        g = bisect_right(self.starts, i) - 1
+        return self.groups[g], i - self.starts[g]
+
+    def __getitem__(self, i):
+        (byte_len, first_char, count, words_offset, ranks_offset, units_offset), j = self._locate(i)
+        start = words_offset + j * byte_len
+        return self.buffer[start:start + byte_len].decode('utf-8')
+
+    def units(self, i):
+        # unit ของคำที่ i ตามจุดแบ่งที่คำนวณไว้ตอน build (ไม่ต้องแยกใหม่)
+        (byte_len, first_char, count, words_offset, ranks_offset, units_offset), j = self._locate(i)
+        start = words_offset + j * byte_len
+        data = self.buffer[start:start + byte_len]
+        if not units_offset:
+            return tuple(data.decode('ascii'))
+        stride = (byte_len + 7) // 8
+        mask = int.from_bytes(self.buffer[units_offset + j * stride:units_offset + (j + 1) * stride], 'little')
+        cuts = [k for k in range(byte_len) if mask >> k & 1] + [byte_len]
+        return tuple(data[a:b].decode('utf-8') for a, b in zip(cuts, cuts[1:]))
+
+    def group_ranks(self):
+        """คืน (first_char, start, ranks, lengths) ของแต่ละกลุ่ม อ่านทั้งกลุ่มทีเดียวโดยไม่ต้อง decode คำ
+        lengths = จำนวน unit ของแต่ละคำ (กลุ่ม ASCII ทุกคำยาว byte_len จึงคืนเป็นตัวเลขเดียว)"""
+        for (byte_len, first_char, count, words_offset, ranks_offset, units_offset), start in zip(self.groups, self.starts):
+            ranks = array('I')
+            ranks.frombytes(self.buffer[ranks_offset:ranks_offset + count * RANK.size])
+            if sys.byteorder == "big":
+                ranks.byteswap()
+            lengths = byte_len
+            if units_offset:
+                stride = (byte_len + 7) // 8
+                bitmaps = self.buffer[units_offset:units_offset + count * stride]
+                lengths = [bin(int.from_bytes(bitmaps[k:k + stride], 'little')).count("1") for k in range(0, len(bitmaps), stride)]
+            yield chr(first_char), start, ranks, lengths
+
+    def is_fresh(self, src_path):
+        stat = os.stat(src_path)
+        if stat.st_mtime_ns == self.src_mtime_ns and stat.st_size == self.src_size:
+            return True
+        # mtime เปลี่ยน (เช่น copy ไฟล์มาใหม่) แต่เนื้อหาอาจเหมือนเดิม ให้เช็ค hash อีกชั้น
+        return stat.st_size == self.src_size and file_digest(src_path) == self.src_digest
+
+    def close(self):
+        self.buffer.close()
+
+def load_or_build(src_path, index_path=None, progress=None):
+    """โหลด index ถ้ายังตรงกับไฟล์ต้นฉบับ ไม่อย่างนั้น compile ใหม่"""
+    if index_path is None:
+        index_path = src_path + ".idx"
+    try:
+        index = WordIndex(index_path)
+        if index.is_fresh(src_path):
+            if progress:
+                progress(1.0)
+            return index
+        index.close()
+    except (OSError, ValueError, struct.error):
+        pass
+
+    try:
+        build_index(src_path, index_path, progress)
+        return WordIndex(index_path)
+    except FileNotFoundError:
+        raise   # ไม่มีไฟล์ต้นฉบับ ให้คนเรียกไปใช้คำศัพท์สำรอง
+    except OSError:
+        # โฟลเดอร์เกมเขียนไม่ได้ (เช่นติดตั้งใน Program Files หรือ filesystem แบบอ่านอย่างเดียว) ก็ใช้ list ธรรมดาไป
+        return WordList(read_source(src_path, progress))
+
+class WordList(list):
+    """list ของคำพร้อม unit ที่แยกไว้แล้ว ใช้แทน WordIndex ตอนไม่มีไฟล์ index (เช่นคำศัพท์สำรอง)"""
+    def __init__(self, words):
+        super().__init__(words)
+        self.unit_table = [segment(word) for word in self]
+
+    def units(self, i):
+        return self.unit_table[i]
@@ -0,0 +1,123 @@
+from array import array
+
+# ==========================================
+# Word Sampler (สุ่มคำตามความถี่และความยาก)
+# ==========================================
+# words.txt เรียงตามความถี่ (the, of, and, ...) จึงใช้ลำดับในไฟล์ (rank) เป็นน้ำหนักได้เลย
+# น้ำหนักของแต่ละคำ = (rank + RANK_OFFSET) ** -common_bias * (1 ถ้าความยาวอยู่ในช่วง word_length ไม่อย่างนั้น OFF_LENGTH_WEIGHT)
+# ความยาวนับเป็นจำนวน unit ที่พิมพ์ (ดู word_index.segment) ไม่ใช่จำนวน byte
+#
+# สร้าง alias table (Vose) แยกตามตัวอักษรแรก สุ่มได้ O(1) ต่อครั้งไม่ว่าจะมีกี่คำ:
+#   1) เลือกตัวอักษรแรกจาก alias table ของตัวอักษร (ถ้าตรงกับตัวที่อยู่บนจอแล้วให้สุ่มใหม่)
+#   2) เลือกคำในกลุ่มนั้นจาก alias table ของกลุ่ม
+
+RANK_OFFSET = 50
+OFF_LENGTH_WEIGHT = 0.02
+MAX_REJECTS = 8   # สุ่มตัวอักษรซ้ำได้กี่ครั้งก่อนเปลี่ยนไปไล่หาตัวที่เหลือแบบตรงๆ
+
+# ค่าเริ่มต้นถ้า settings ไม่ได้กำหนด (สุ่มเท่ากันทุกคำเหมือนเดิม)
+DEFAULT_PROFILE = {"word_length": [1, 99], "common_bias": 0.0}
+
+class AliasTable:
+    """สุ่ม index 0..n-1 ตามน้ำหนัก ใช้ rng.random() ครั้งเดียวต่อการสุ่ม"""
+    def __init__(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        self.n = n
+        self.prob = array('d', [1.0]) * n
+        self.alias = array('I', range(n))
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            g = large[-1]
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            if scaled[g] < 1.0:
+                small.append(large.pop())
+        # ที่เหลือคือ 1.0 (ค่าทศนิยมคลาดเคลื่อนนิดหน่อย) ค่าเริ่มต้นตั้งไว้แล้ว
+
+    def draw(self, rng):
+        u = rng.random() * self.n
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+def word_entries(words):
+    """คืน (ตัวอักษรแรก, ความยาว, rank, index) ของทุกคำ ใช้ข้อมูลกลุ่มใน WordIndex ถ้ามี (ไม่ต้อง decode ทีละคำ)"""
+    group_ranks = getattr(words, "group_ranks", None)
+    if group_ranks is not None:
+        for first_char, start, ranks, lengths in group_ranks():
+            for offset, rank in enumerate(ranks):
+                yield first_char, lengths if isinstance(lengths, int) else lengths[offset], rank, start + offset
+    else:
+        units = getattr(words, "units", None)
+        for index, word in enumerate(words):
+            yield word[0], len(units(index)) if units else len(word), index, index
+
+class WordSampler:
+    def __init__(self, words, word_length=(1, 99), common_bias=0.0):
+        min_length, max_length = word_length
+        groups = {}
+        for first_char, length, rank, index in word_entries(words):
+            weight = (rank + RANK_OFFSET) ** -common_bias
+            if not min_length <= length <= max_length:
+                weight *= OFF_LENGTH_WEIGHT
+            indices, weights = groups.setdefault(first_char, (array('I'), []))
+            indices.append(index)
+            weights.append(weight)
+
+        self.words = words
+        self.letters = sorted(groups)
+        self.letter_weights = [sum(groups[letter][1]) for letter in self.letters]
+        self.letter_table = AliasTable(self.letter_weights)
+        self.buckets = [(groups[letter][0], AliasTable(groups[letter][1])) for letter in self.letters]
+
+    def _pick_letter(self, rng, avoid):
+        if not avoid:
+            return self.letter_table.draw(rng)
+        for _ in range(MAX_REJECTS):
+            i = self.letter_table.draw(rng)
+            if self.letters[i] not in avoid:
+                return i
+        # ตัวอักษรส่วนใหญ่อยู่บนจอแล้ว ไล่สุ่มจากตัวที่เหลือ (ไม่เกินจำนวนตัวอักษร ไม่ขึ้นกับจำนวนคำ)
+        allowed = [i for i, letter in enumerate(self.letters) if letter not in avoid]
+        if not allowed:
+            return self.letter_table.draw(rng)
+        target = rng.random() * sum(self.letter_weights[i] for i in allowed)
+        for i in allowed:
+            target -= self.letter_weights[i]
+            if target < 0:
+                return i
+        return allowed[-1]
+
+    def sample_index(self, rng, avoid=()):
+        """สุ่ม index ของคำ avoid = ตัวอักษรแรกที่ไม่อยากได้ (เช่นที่มีศัตรูบนจออยู่แล้ว)"""
+        indices, table = self.buckets[self._pick_letter(rng, avoid)]
+        return indices[table.draw(rng)]
+
+# --- cache ต่อ (word list, โปรไฟล์) สร้างครั้งเดียวแล้วใช้ซ้ำทุกเกม ---
+_samplers = {}
+MAX_CACHED = 8
+
+def profile_of(settings):
+    word_length = settings.get("word_length", DEFAULT_PROFILE["word_length"])
+    return tuple(word_length), settings.get("common_bias", DEFAULT_PROFILE["common_bias"])
+
+def get_sampler(words, settings):
+    word_length, common_bias = profile_of(settings)
+    key = (id(words), word_length, common_bias)
+    cached = _samplers.get(key)
+    if cached is not None and cached.words is words:
+        return cached
+    sampler = WordSampler(words, word_length, common_bias)
+    if len(_samplers) >= MAX_CACHED:
+        _samplers.pop(next(iter(_samplers)))
+    _samplers[key] = sampler
+    return sampler
+
+def prepare(words, settings_list):
+    # เรียกจาก thread ที่โหลดคำศัพท์ ให้ตารางพร้อมก่อนเริ่มเกม (เกมแรกจะได้ไม่ต้องรอสร้าง)
+    for settings in settings_list:
+        get_sampler(words, settings)